@@ -0,0 +1,7 @@
+"""
+Benchmarks, not part of the installed package.
+
+``python -m benchmarks.suite`` runs the suite over a configuration from
+``benchmarks.generate``; the bench_*.py scripts each compare one change
+against the code it replaced.
+"""
@@ -0,0 +1,57 @@
+"""
+Micro-benchmark attribute and item reads on config nodes, comparing the
+original _YAMLObj.__getattribute__ (hasattr(v, '__get__') on every read)
+with the current one
+
+    python benchmarks/bench_access.py [number]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_memory import DoubleStoreYAMLObj  # noqa: E402
+from configuration._base import _YAMLObj  # noqa: E402
+from configuration.tags.ref import Ref  # noqa: E402
+
+
+class OriginalYAMLObj(DoubleStoreYAMLObj):
+    "_YAMLObj as it was before tracking descriptor types"
+    def __getattribute__(self, name):
+        v = super(OriginalYAMLObj, self).__getattribute__(name)
+
+        if hasattr(v, '__get__'):
+            return v.__get__(self, _YAMLObj)
+
+        return v
+
+    __setitem__ = DoubleStoreYAMLObj.__setattr__
+    __getitem__ = __getattribute__
+
+
+STATEMENTS = (
+    ('attribute str', 'node.name'),
+    ('attribute int', 'node.port'),
+    ('item str', 'node["name"]'),
+    ('attribute ref', 'node.ref'),
+)
+
+
+def main(number=1000000):
+    document = {'name': 'service', 'port': 8080, 'ref': Ref('name')}
+
+    for label, statement in STATEMENTS:
+        results = []
+        for node_class in (OriginalYAMLObj, _YAMLObj):
+            node = node_class(document)
+            seconds = min(timeit.repeat(statement, globals={'node': node},
+                                        number=number, repeat=5))
+            results.append(seconds / number * 1e9)
+
+        print('{:<14} original {:>6.1f}ns  current {:>6.1f}ns'.format(
+            label, *results))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
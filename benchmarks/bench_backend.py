@@ -0,0 +1,39 @@
+"""
+Compare the libyaml and pure python backends of Configuration.load
+
+    python benchmarks/bench_backend.py [sections] [repeat]
+"""
+import os
+import sys
+import timeit
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_parse import make_config  # noqa: E402
+from configuration._loader import parse, loader_class  # noqa: E402
+from configuration.tags import TagRegistry  # noqa: E402
+
+
+def main(sections=2000, repeat=3):
+    if not hasattr(yaml, 'CLoader'):
+        print('PyYAML is built without libyaml, nothing to compare')
+        return
+
+    TagRegistry().setup_yaml(yaml)
+    data = make_config(sections)
+    print('{} lines'.format(data.count('\n')))
+
+    results = {}
+    for backend in ('python', 'c'):
+        Loader = loader_class(backend)
+        results[backend] = min(timeit.repeat(lambda: parse(data, Loader),
+                                             number=1, repeat=repeat))
+        print('{:<7} {:.3f}s'.format(backend, results[backend]))
+
+    print('speedup: {:.2f}x'.format(results['python'] / results['c']))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
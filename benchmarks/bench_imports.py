@@ -0,0 +1,75 @@
+"""
+Measure how much of Configuration() is spent importing !!object targets.
+Each target lives in a generated module that does some work at import
+time. Every run is a fresh interpreter, so nothing is imported yet
+
+    python benchmarks/bench_imports.py [modules]
+"""
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULE = '''
+TABLE = [i * i for i in range(100000)]
+
+
+def factory():
+    return len(TABLE)
+'''
+
+SCRIPT = '''
+import sys
+import time
+sys.path[:0] = [{root!r}, {modules!r}]
+from configuration import Configuration
+
+start = time.time()
+config = Configuration({cfg_file!r})
+load = time.time() - start
+
+start = time.time()
+config.obj_0
+first_read = time.time() - start
+
+start = time.time()
+Configuration({cfg_file!r})
+reload = time.time() - start
+print('{{:.4f}} {{:.4f}} {{:.4f}}'.format(load, first_read, reload))
+'''
+
+
+def run(tmp, tag, modules):
+    cfg_file = os.path.join(tmp, '{}.yaml'.format(tag.replace('/', '_')))
+    with open(cfg_file, 'w') as f:
+        for i in range(modules):
+            f.write('obj_{0}: !!{1}:heavy_{0}.factory\n'.format(i, tag))
+
+    script = SCRIPT.format(root=ROOT, modules=tmp, cfg_file=cfg_file)
+    output = subprocess.check_output([sys.executable, '-c', script])
+    return [float(x) for x in output.split()]
+
+
+def main(modules=30):
+    tmp = tempfile.mkdtemp()
+    try:
+        for i in range(modules):
+            with open(os.path.join(tmp, 'heavy_{}.py'.format(i)), 'w') as f:
+                f.write(MODULE)
+
+        print('{} modules, times in seconds'.format(modules))
+        print('{:<12} {:>8} {:>11} {:>8}'.format('tag', 'load',
+                                                 'first read', 'reload'))
+        for tag in ('object', 'object/lazy'):
+            load, first_read, reload = run(tmp, tag, modules)
+            print('{:<12} {:>8.4f} {:>11.4f} {:>8.4f}'.format(
+                tag, load, first_read, reload))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
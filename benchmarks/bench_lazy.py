@@ -0,0 +1,48 @@
+"""
+Compare eager and lazy wrapping of a loaded document when only a few keys
+are read
+
+    python benchmarks/bench_lazy.py [sections] [repeat]
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_parse import make_config  # noqa: E402
+from configuration._base import _YAMLObj, _LazyYAMLObj  # noqa: E402
+from configuration._loader import parse  # noqa: E402
+from configuration.tags import TagRegistry  # noqa: E402
+
+
+def load_and_touch(node_class, document):
+    config = node_class(document)
+    return config.section_0.nested.level, config.section_1.hosts[0]
+
+
+def peak_memory(node_class, document):
+    tracemalloc.start()
+    load_and_touch(node_class, document)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(sections=5000, repeat=3):
+    import yaml
+    TagRegistry().setup_yaml(yaml)
+    document = parse(make_config(sections))[1]
+
+    for name, node_class in (('eager', _YAMLObj), ('lazy', _LazyYAMLObj)):
+        seconds = min(timeit.repeat(
+            lambda: load_and_touch(node_class, document),
+            number=1, repeat=repeat))
+        peak = peak_memory(node_class, document)
+        print('{:<6} {:.4f}s {:>8.1f} KiB peak'.format(
+            name, seconds, peak / 1024.0))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
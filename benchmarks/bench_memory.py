@@ -0,0 +1,68 @@
+"""
+Compare the memory held by a wrapped config tree with the old node that
+stored every key twice (instance __dict__ and dict) against the current
+single store node
+
+    python benchmarks/bench_memory.py [sections]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_parse import make_config  # noqa: E402
+from configuration._base import _YAMLObj, Mapping  # noqa: E402
+from configuration._loader import parse  # noqa: E402
+from configuration.tags import TagRegistry  # noqa: E402
+
+
+class DoubleStoreYAMLObj(dict):
+    "_YAMLObj as it was before the single store"
+    def __init__(self, obj=None, **kwargs):
+        super(DoubleStoreYAMLObj, self).__init__()
+        self.update(obj)
+        self.update(**kwargs)
+
+    def update(self, other=None, **kwargs):
+        if isinstance(other, Mapping):
+            self.update(**other)
+
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def __setattr__(self, name, value):
+        if isinstance(value, Mapping):
+            value = self.__class__(value)
+        elif isinstance(value, (list, tuple)):
+            value = [self.__class__(x)
+                     if isinstance(x, dict) else x for x in value]
+
+        super(DoubleStoreYAMLObj, self).__setattr__(name, value)
+        super(DoubleStoreYAMLObj, self).__setitem__(name, value)
+
+
+def retained_memory(node_class, document):
+    tracemalloc.start()
+    config = node_class(document)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del config
+    return size
+
+
+def main(sections=5000):
+    import yaml
+    TagRegistry().setup_yaml(yaml)
+    document = parse(make_config(sections))[1]
+
+    old = retained_memory(DoubleStoreYAMLObj, document)
+    new = retained_memory(_YAMLObj, document)
+
+    print('double store: {:>8.1f} KiB'.format(old / 1024.0))
+    print('single store: {:>8.1f} KiB'.format(new / 1024.0))
+    print('saved:        {:>7.1f}%'.format(100.0 * (old - new) / old))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,54 @@
+"""
+Compare the single-pass parser against the old safe_load + load double parse
+
+    python benchmarks/bench_parse.py [sections] [repeat]
+"""
+import os
+import sys
+import timeit
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from configuration._loader import parse  # noqa: E402
+from configuration.tags import TagRegistry  # noqa: E402
+
+
+def make_config(sections):
+    lines = []
+    for i in range(sections):
+        lines.append('section_{}:'.format(i))
+        lines.append('  name: section number {}'.format(i))
+        lines.append('  enabled: {}'.format('yes' if i % 2 else 'no'))
+        lines.append('  ratio: {}'.format(i / 7.0))
+        lines.append('  ref: !!ref:name')
+        lines.append('  hosts:')
+        for j in range(5):
+            lines.append('    - host-{}-{}.example.com'.format(i, j))
+        lines.append('  nested:')
+        lines.append('    level: {}'.format(i))
+        lines.append('    tags: [a, b, c]')
+    return '\n'.join(lines) + '\n'
+
+
+def double_parse(data):
+    return yaml.safe_load(data), yaml.load(data, Loader=yaml.Loader)
+
+
+def main(sections=2000, repeat=3):
+    TagRegistry().setup_yaml(yaml)
+    data = make_config(sections)
+    print('{} lines'.format(data.count('\n')))
+
+    old = min(timeit.repeat(lambda: double_parse(data), number=1,
+                            repeat=repeat))
+    new = min(timeit.repeat(lambda: parse(data), number=1, repeat=repeat))
+
+    print('double parse: {:.3f}s'.format(old))
+    print('single parse: {:.3f}s'.format(new))
+    print('speedup:      {:.2f}x'.format(old / new))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
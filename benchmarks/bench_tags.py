@@ -0,0 +1,66 @@
+"""
+Compare PyYAML's multi tag lookup, which tries every registered prefix on
+each tagged node, against the dispatch table of TagRegistry().loader()
+when many tags are registered
+
+    python benchmarks/bench_tags.py [refs] [tags] [repeat]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from configuration._loader import loader_class, parse  # noqa: E402
+from configuration.tags import TagRegistry  # noqa: E402
+from configuration.tags._base import _tag  # noqa: E402
+
+
+def make_config(refs):
+    lines = ['value: worked']
+    for i in range(refs):
+        lines.append('ref_{}: !!ref:value'.format(i))
+    return '\n'.join(lines) + '\n'
+
+
+def register_tags(count):
+    def constructor(loader, suffix, node):
+        return suffix
+
+    for i in range(count):
+        TagRegistry.register_multi_tag('bench/tag{}'.format(i),
+                                       constructor=constructor)
+
+
+def scanning_loader(base):
+    "A Loader with the tags added the way PyYAML's add_multi_constructor does"
+    tags = TagRegistry()
+    cls = type(base.__name__, (base,), {})
+    for tag, constructor in tags.tag_constructors:
+        cls.add_constructor(_tag(tag), constructor)
+    # ref is registered first, put it last as a dozen custom tags would be
+    for tag, constructor in reversed(list(tags.multi_tag_constructors)):
+        cls.add_multi_constructor(_tag(tag), constructor)
+    return cls
+
+
+def main(refs=20000, tags=12, repeat=3):
+    register_tags(tags)
+    base = loader_class()
+    data = make_config(refs)
+    print('{} refs, {} extra tags, {}'.format(refs, tags, base.__name__))
+
+    old_loader = scanning_loader(base)
+    new_loader = TagRegistry().loader(base)
+    old = min(timeit.repeat(lambda: parse(data, old_loader), number=1,
+                            repeat=repeat))
+    new = min(timeit.repeat(lambda: parse(data, new_loader), number=1,
+                            repeat=repeat))
+
+    print('prefix scan:    {:.3f}s'.format(old))
+    print('dispatch table: {:.3f}s'.format(new))
+    print('speedup:        {:.2f}x'.format(old / new))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,97 @@
+"""
+Deterministic synthetic configurations
+
+    python -m benchmarks.generate [sections] > large.yaml
+
+The same arguments always give the same document, so timings from
+different runs are of the same input.
+"""
+import sys
+import random
+
+from collections import namedtuple
+
+__all__ = ['Sample', 'generate']
+
+Sample = namedtuple('Sample', 'data paths refs objects')
+
+# Targets built by !!object and !!object/call, both are in the stdlib
+OBJECT_TAGS = (
+    '!!object:os.path.join',
+    '!!object/call:datetime.timedelta {{seconds: {}}}',
+)
+
+
+def generate(sections=200, depth=3, width=5, items=5, refs=0.1,
+             objects=0.01, seed=0):
+    """
+    A YAML document of sections top level mappings, each nested depth
+    levels deep. Every level has a list of items scalars under hosts, the
+    next level under nested and width scalar keys. refs and objects are the
+    fractions of scalar keys that are a !!ref or an !!object tag. Refs are
+    relative to the mapping they are in, so they point at a plain scalar
+    in that mapping or below it.
+
+    Returns a Sample with the document and the dotted paths of the plain
+    scalars, the refs and the objects in it.
+    """
+    rnd = random.Random(seed)
+    sample = Sample([], [], [], [])
+
+    for section in range(sections):
+        sample.data.append('section_{}:'.format(section))
+        _level(rnd, sample, 'section_{}'.format(section), 1, depth, width,
+               items, refs, objects)
+
+    return sample._replace(data='\n'.join(sample.data) + '\n')
+
+
+def _level(rnd, sample, path, level, depth, width, items, refs, objects):
+    "Adds one mapping, returns the paths of its plain scalars relative to it"
+    indent = '    ' * level
+    targets = []
+
+    sample.data.append('{}hosts:'.format(indent))
+    for i in range(items):
+        sample.data.append('{}    - {}'.format(indent, _scalar(rnd)))
+        sample.paths.append('{}.hosts.{}'.format(path, i))
+        targets.append('hosts.{}'.format(i))
+
+    if level < depth:
+        sample.data.append('{}nested:'.format(indent))
+        targets.extend('nested.' + target for target in _level(
+            rnd, sample, path + '.nested', level + 1, depth, width, items,
+            refs, objects))
+
+    for i in range(width):
+        key = 'key_{}'.format(i)
+        roll = rnd.random()
+        if roll < refs and targets:
+            sample.refs.append('{}.{}'.format(path, key))
+            value = '!!ref:{}'.format(rnd.choice(targets))
+        elif roll < refs + objects:
+            sample.objects.append('{}.{}'.format(path, key))
+            value = rnd.choice(OBJECT_TAGS).format(rnd.randint(1, 3600))
+        else:
+            sample.paths.append('{}.{}'.format(path, key))
+            targets.append(key)
+            value = _scalar(rnd)
+
+        sample.data.append('{}{}: {}'.format(indent, key, value))
+
+    return targets
+
+
+def _scalar(rnd):
+    kind = rnd.randint(0, 3)
+    if kind == 0:
+        return str(rnd.randint(0, 100000))
+    if kind == 1:
+        return '{:.4f}'.format(rnd.random() * 1000)
+    if kind == 2:
+        return rnd.choice(('true', 'false'))
+    return 'value-{:08x}'.format(rnd.getrandbits(32))
+
+
+if __name__ == '__main__':
+    sys.stdout.write(generate(*[int(arg) for arg in sys.argv[1:2]]).data)
@@ -0,0 +1,212 @@
+"""
+Benchmark suite over a generated configuration
+
+    python -m benchmarks.suite [--sections N] [--output results.json]
+                               [--compare baseline.json]
+
+Measures load time (eager and lazy), peak memory while loading, attribute
+and item read latency, ref resolution throughput, !!object construction
+and dump time. Results are written as JSON so runs can be compared with
+--compare.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+
+import yaml
+
+from configuration import Configuration, __version__
+from .generate import generate
+
+__all__ = ['run', 'main']
+
+
+def run(sections=200, depth=3, width=5, items=5, refs=0.1, objects=0.01,
+        seed=0, repeat=5):
+    "Run every benchmark, returns the results as a JSON ready dict"
+    params = dict(sections=sections, depth=depth, width=width, items=items,
+                  refs=refs, objects=objects, seed=seed, repeat=repeat)
+    sample = generate(sections, depth, width, items, refs, objects, seed)
+    object_sample = generate(max(sections // 10, 1), depth, width, items,
+                             0, 1, seed)
+
+    tmpdir = tempfile.mkdtemp(prefix='configuration-bench')
+    try:
+        path = _write(tmpdir, 'config.yaml', sample.data)
+        object_path = _write(tmpdir, 'objects.yaml', object_sample.data)
+        results = {}
+
+        results['load'] = _seconds(lambda: Configuration(path), repeat)
+        results['load_lazy'] = _seconds(
+            lambda: Configuration(path, lazy=True), repeat)
+        results['load_peak_memory'] = _result(_peak(path), 'bytes')
+
+        config = Configuration(path)
+        paths = [_keys(p) for p in sample.paths]
+        results['attribute_read'] = _per_op(
+            lambda: _read_attributes(config, paths), len(paths), repeat)
+        results['item_read'] = _per_op(
+            lambda: _read_items(config, paths), len(paths), repeat)
+
+        ref_paths = [_keys(p) for p in sample.refs]
+        results['ref_resolve_cold'] = _throughput(
+            lambda: Configuration(path), ref_paths, repeat)
+        results['ref_resolve_warm'] = _throughput(
+            lambda: config, ref_paths, repeat)
+
+        results['object_load'] = _seconds(
+            lambda: Configuration(object_path), repeat)
+        results['dump'] = _seconds(lambda: str(config), repeat)
+    finally:
+        shutil.rmtree(tmpdir)
+
+    return {
+        'meta': {
+            'configuration': __version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'pyyaml': yaml.__version__,
+            'libyaml': getattr(yaml, 'CLoader', None) is not None,
+            'lines': sample.data.count('\n'),
+            'scalars': len(sample.paths),
+            'refs': len(sample.refs),
+            'objects': len(object_sample.objects),
+            'params': params,
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline):
+    "Lines comparing two runs, a ratio above 1 means results is slower"
+    lines = []
+    for name in sorted(results['results']):
+        new = results['results'][name]
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+
+        ratio = new['value'] / old['value'] if old['value'] else 0
+        if new['unit'] == 'ops/s' and ratio:
+            ratio = 1 / ratio
+
+        lines.append('{:<20} {:>14.6g} {:>14.6g} {:>8.2f}x  {}'.format(
+            name, old['value'], new['value'], ratio, new['unit']))
+
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmarks.suite')
+    parser.add_argument('--sections', type=int, default=200)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--width', type=int, default=5)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--refs', type=float, default=0.1)
+    parser.add_argument('--objects', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--compare', help='results of an earlier run')
+    args = parser.parse_args(argv)
+
+    results = run(args.sections, args.depth, args.width, args.items,
+                  args.refs, args.objects, args.seed, args.repeat)
+    text = json.dumps(results, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['meta']['params'] != results['meta']['params']:
+            sys.stderr.write('warning: runs used different parameters\n')
+        print('\n'.join(compare(results, baseline)))
+
+    return 0
+
+
+def _write(tmpdir, name, data):
+    path = os.path.join(tmpdir, name)
+    with open(path, 'w') as f:
+        f.write(data)
+    return path
+
+
+def _result(value, unit):
+    return {'value': value, 'unit': unit}
+
+
+def _time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def _seconds(func, repeat):
+    return _result(_time(func, repeat), 's')
+
+
+def _per_op(func, count, repeat):
+    return _result(_time(func, repeat) * 1e9 / max(count, 1), 'ns')
+
+
+def _throughput(build, paths, repeat):
+    "Reads every ref of a config from build() once, build is not timed"
+    best = None
+    for _ in range(repeat):
+        config = build()
+        elapsed = _time(lambda: _read_attributes(config, paths), 1)
+        if best is None or elapsed < best:
+            best = elapsed
+    return _result(len(paths) / best if best else 0, 'ops/s')
+
+
+def _peak(path):
+    tracemalloc.start()
+    try:
+        Configuration(path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _keys(path):
+    return [int(key) if key.isdigit() else key for key in path.split('.')]
+
+
+def _read_attributes(config, paths):
+    for keys in paths:
+        value = config
+        for key in keys:
+            if isinstance(key, int):
+                value = value[key]
+            else:
+                value = getattr(value, key)
+
+
+def _read_items(config, paths):
+    # Configuration itself only has attribute access
+    for keys in paths:
+        value = getattr(config, keys[0])
+        for key in keys[1:]:
+            value = value[key]
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,2 +1,7 @@
+from ._version import __version__
 from ._base import Configuration, ConfigurationError
 from .tags import TagRegistry
+from ._changes import ChangeSet
+from ._snapshot import Snapshot
+from ._stats import LoadStats
+from ._access import AccessStats
@@ -0,0 +1,52 @@
+"""
+Command line tools.
+
+    configuration compile base.yaml [override.yaml ...] out.cfgbin
+
+compiles configuration files into one file that Configuration maps instead
+of parsing. Refs are resolved at compile time and every path is indexed, so
+reading a key costs the same however large the file is. Objects are not
+plain data, a file with one does not compile.
+"""
+import sys
+import argparse
+
+from ._base import Configuration, COMPILED_SUFFIX
+from ._merge import MAP_STRATEGIES, LIST_STRATEGIES
+from ._snapshot import Snapshot
+from .errors import ConfigurationError
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='configuration')
+    commands = parser.add_subparsers(dest='command')
+
+    compile_ = commands.add_parser(
+        'compile', help='compile configuration files to a {} file'.format(
+            COMPILED_SUFFIX))
+    compile_.add_argument('inputs', nargs='+', metavar='input',
+                          help='configuration files, merged in order')
+    compile_.add_argument('output', help='the compiled file')
+    compile_.add_argument('--merge', choices=MAP_STRATEGIES,
+                          default='replace')
+    compile_.add_argument('--lists', choices=LIST_STRATEGIES,
+                          default='replace')
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+
+    try:
+        config = Configuration(*args.inputs, resolve='eager',
+                               merge=args.merge, lists=args.lists)
+        Snapshot.save(config, args.output, index=True, strict=True)
+    except (ConfigurationError, IOError) as e:
+        sys.stderr.write('configuration: {}\n'.format(e))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
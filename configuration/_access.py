@@ -0,0 +1,92 @@
+import random
+
+from weakref import ref
+
+__all__ = ['AccessStats']
+
+
+class AccessStats(object):
+    """
+    Reads of a configuration, per dot separated path.
+    Pass one to Configuration(access=...); without one reads are not
+    tracked. A read is an attribute or item read of a key, so reading
+    config.database.host reads database and database.host, and a ref
+    reads the paths it follows each time it is resolved (not when its
+    cached value is returned).
+
+    Whether a key was read is tracked exactly, how often is sampled: one
+    read in every sample (on average, at random) is counted and the counts
+    are scaled back up, so the counters cost little even on hot keys.
+    Counts are approximate under concurrent reads. Reads made while loading
+    are forgotten once the configuration is loaded; the counts of a path
+    carry over reloads and the configurations made by evolve()
+    """
+    def __init__(self, sample=1):
+        if sample < 1:
+            raise ValueError('sample must be at least 1, got {!r}'.format(
+                sample))
+        self.sample = sample
+        self._seen = set()
+        self._counts = {}
+        self._tick = 1
+        self._config = None
+        self.__random = random.Random()
+
+    def _attach(self, config):
+        self._config = ref(config)
+
+    def _count(self, key):
+        "Called on every sample-th read, on average"
+        self._counts[key] = self._counts.get(key, 0) + 1
+        if self.sample > 1:
+            # Uniform over 1 .. 2 * sample - 1, so sample on average
+            self._tick = int(self.__random.random() *
+                             (2 * self.sample - 1)) + 1
+
+    def counts(self):
+        "Estimated reads per path"
+        return dict((path, count * self.sample)
+                    for path, count in list(self._counts.items()))
+
+    def hottest(self, n=10):
+        "The n most read paths, as (path, estimated reads) pairs"
+        counts = self.counts()
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+    def never_read(self):
+        """
+        The paths never read since the configuration was loaded. Below a key
+        that was never read only the key itself is listed
+        """
+        seen = self._seen
+        unread = []
+        stack = [('', self._root())]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in _children(node):
+                path = prefix + str(key)
+                if isinstance(node, dict) and path not in seen:
+                    unread.append(path)
+                elif isinstance(value, (dict, list, tuple)):
+                    stack.append((path + '.', value))
+
+        return sorted(unread)
+
+    def reset(self):
+        "Forget every read"
+        self._seen.clear()
+        self._counts.clear()
+
+    def _root(self):
+        config = self._config() if self._config is not None else None
+        if config is None:
+            return {}
+
+        return config._root()
+
+
+def _children(node):
+    if isinstance(node, dict):
+        return dict.items(node)
+
+    return enumerate(node)
@@ -0,0 +1,113 @@
+
+import asyncio
+
+from functools import partial
+
+from ._base import _Layer, _is_compiled, _compiled_layer
+from ._stats import timed
+from ._watch import file_stamp
+from .tags._object import collect_calls, call_error, dependencies
+
+__all__ = []
+
+# get_running_loop is python 3.7+
+_get_running_loop = getattr(asyncio, 'get_running_loop',
+                            asyncio.get_event_loop)
+
+
+async def aload(cls, cfg_files, options):
+    "Implementation of Configuration.aload"
+    executor = options.get('executor')
+    # The files are watched once they are all loaded
+    watch = options.pop('watch', None)
+    config = cls(**options)
+    loop = _get_running_loop()
+
+    documents = await asyncio.gather(*[
+        _parse(loop, config, cfg_file) for cfg_file in cfg_files])
+
+    calls = [obj for layer, objs in documents for obj in objs]
+    with timed(config._stats, 'calls'):
+        await _call_all(loop, calls, executor)
+
+    for layer, objs in documents:
+        config._add(layer)
+    config._compile()
+    config._start(watch)
+
+    return config
+
+
+async def _parse(loop, config, cfg_file):
+    if _is_compiled(cfg_file):
+        layer = await loop.run_in_executor(None, _compiled_layer, cfg_file)
+        return layer, []
+
+    stamp, data = await loop.run_in_executor(None, _read, cfg_file,
+                                             config._stats)
+    return await loop.run_in_executor(None, _collect, config, data, cfg_file,
+                                      stamp)
+
+
+def _read(cfg_file, stats):
+    stamp = file_stamp(cfg_file)
+    with timed(stats, 'read', cfg_file):
+        with open(cfg_file) as f:
+            return stamp, f.read()
+
+
+def _collect(config, data, name, stamp):
+    # collect_calls is per thread, so it has to wrap the parse in the worker
+    with collect_calls() as calls:
+        raw, parsed = config._parse(data, name)
+
+    return _Layer(name, stamp, raw, parsed), calls
+
+
+async def _call_all(loop, calls, executor):
+    """
+    Build the collected !!object/call objects. Like call_all, an object is
+    built once the objects in its arguments are, but coroutine functions are
+    awaited on the loop and other targets run in the executor
+    """
+    pending = set(calls)
+    tasks = {}
+
+    async def build(obj):
+        for dependency in dependencies(obj, pending):
+            try:
+                await tasks[dependency]
+            except Exception:
+                raise _Skipped()
+
+        target = obj._target()
+        if asyncio.iscoroutinefunction(target):
+            value = await target(*obj._args, **obj._kwargs)
+        else:
+            value = await loop.run_in_executor(
+                executor, partial(target, *obj._args, **obj._kwargs))
+            if asyncio.iscoroutine(value):
+                value = await value
+
+        obj._instance = value
+
+    for obj in calls:
+        tasks[obj] = asyncio.ensure_future(build(obj))
+
+    results = await asyncio.gather(*[tasks[obj] for obj in calls],
+                                   return_exceptions=True)
+
+    errors = []
+    skipped = []
+    for obj, result in zip(calls, results):
+        if isinstance(result, _Skipped):
+            skipped.append(obj)
+        elif isinstance(result, Exception):
+            errors.append((obj, result))
+
+    if errors:
+        raise call_error(errors, skipped)
+
+
+class _Skipped(Exception):
+    pass
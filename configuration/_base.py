@@ -1,43 +1,374 @@
 
+import os
 import yaml
-import collections
 
+from threading import Lock
+from weakref import WeakSet
+
+from ._cache import ConfigCache
+from ._changes import ChangeSet
+from ._graph import RefGraph
+from ._loader import parse, loader_class
+from ._merge import Merger, ListItems, _is_list
+from ._snapshot import Snapshot, SnapshotMapping, SnapshotList
+from ._stats import timed
+from ._subscribe import PathTrie, ref_targets, is_ref
+from ._watch import file_stamp, Watcher, log
 from .tags import TagRegistry
+from .tags.merge import Merge
+from .tags._object import collect_calls, call_all, check_executor
 from .errors import ConfigurationError
 
+try:
+    from collections.abc import Mapping
+except ImportError:  # py2
+    from collections import Mapping
+
 __all__ = ['Configuration']
 
+RESOLVE_MODES = ('lazy', 'eager')
+COMPILED_SUFFIX = '.cfgbin'
+
 
 class Configuration(object):
     __raw = None
     __parsed = None
+    __loader = None
+    __cache = None
+    __node_class = None
+    __resolve = None
+    __executor = None
+    __merger = None
+    __raw_merger = None
+    __layers = None
+    __reload_lock = None
+    __watcher = None
+    __subscribers = None
+    __refs = None
+    __stats = None
+    __access = None
 
-    def __init__(self, *cfg_files):
+    def __init__(self, *cfg_files, **options):
         super(Configuration, self).__init__()
 
+        self.__loader = loader_class(options.pop('backend', 'auto'))
+        cache = options.pop('cache', None)
+        if cache:
+            self.__cache = ConfigCache(cache)
+        lazy = options.pop('lazy', False)
+        frozen = options.pop('frozen', False)
+        if lazy and frozen:
+            raise ConfigurationError('lazy and frozen can not be combined')
+        self.__node_class = (_LazyYAMLObj if lazy else
+                             _FrozenYAMLObj if frozen else _YAMLObj)
+        self.__access = options.pop('access', None)
+        if self.__access is not None:
+            self.__node_class = _tracked(self.__node_class, self.__access)
+            self.__access._attach(self)
+        self.__resolve = options.pop('resolve', 'lazy')
+        if self.__resolve not in RESOLVE_MODES:
+            msg = 'Unknown resolve mode {!r}, expected one of {}'
+            raise ConfigurationError(msg.format(self.__resolve,
+                                                ', '.join(RESOLVE_MODES)))
+        self.__executor = options.pop('executor', None)
+        check_executor(self.__executor)
+        maps = options.pop('merge', 'replace')
+        lists = options.pop('lists', 'replace')
+        self.__merger = Merger(maps, lists, self.__node_class,
+                               self.__node_class._wrap, _store)
+        self.__raw_merger = Merger(maps, lists)
+        watch = options.pop('watch', None)
+        self.__stats = options.pop('stats', None)
+        _check_options(options)
+
         self.__raw = {}
-        self.__parsed = _YAMLObj()
+        self.__parsed = self.__node_class()
+        self.__layers = []
+        self.__reload_lock = Lock()
+        self.__subscribers = PathTrie()
+        self.__refs = PathTrie()
 
         for cfg_file in cfg_files:
-            self.load(cfg_file)
+            self.__load(cfg_file)
+
+        self._compile()
+        self._start(watch)
+
+    @classmethod
+    def aload(cls, *cfg_files, **options):
+        """
+        Coroutine that loads a Configuration without blocking the event loop.
+        Files are read and parsed concurrently in executors and the
+        !!object/call targets returning coroutines are awaited; async
+        !!object/lazy targets are awaited when they are first read.
+        Usage: config = await Configuration.aload(*cfg_files, **options)
+        """
+        # Imported here so the py3 only syntax stays out of py2 imports
+        from ._async import aload
+        return aload(cls, cfg_files, options)
 
     def load(self, cfg_file):
+        with self.__reload_lock:
+            layer = self.__read(cfg_file)
+            # Merged into a copy of the top level and swapped in, like reload
+            with timed(self.__stats, 'merge', cfg_file):
+                raw, parsed = dict(self.__raw), self.__copy(self.__parsed)
+                self.__raw_merger.update(raw, layer.raw)
+                self.__merger.update(parsed, layer.parsed)
+            self._compile(parsed)
+
+            self.__layers.append(layer)
+            self.__index_refs(layer, self.__refs.add)
+            changes = ChangeSet.diff(self.__raw, raw, layer.raw)
+            self.__raw, self.__parsed = raw, parsed
+            changes, callbacks = self.__dispatch(changes)
+
+        _call(callbacks, changes)
+
+    def evolve(self, changes):
+        """
+        A copy of the configuration with the values in changes, a mapping of
+        dot separated paths (digits index lists) to values. Only the
+        containers on the changed paths are copied, everything else is
+        shared with this configuration, so with frozen=True both stay
+        immutable and safe to share.
+        The copy does not watch the files or keep the subscriptions
+        """
+        document = _evolve_document(self.__raw, changes)
+        raw, parsed = dict(self.__raw), self.__copy(self.__parsed)
+        Merger('deep').update(raw, document)
+        Merger('deep', new=self.__node_class, wrap=self.__node_class._wrap,
+               store=_store).update(parsed, document)
+        self._compile(parsed)
+
+        config = object.__new__(type(self))
+        config.__dict__.update(self.__dict__)
+        config.__raw, config.__parsed = raw, parsed
+        config.__layers = list(self.__layers)
+        config.__reload_lock = Lock()
+        config.__watcher = None
+        config.__subscribers = PathTrie()
+        config.__refs = PathTrie()
+        for layer in config.__layers:
+            config.__index_refs(layer, config.__refs.add)
+
+        return config
+
+    def _root(self):
+        "The current snapshot of the tree"
+        return self.__parsed
+
+    @property
+    def _stats(self):
+        "The LoadStats given as stats=, None when loading is not timed"
+        return self.__stats
+
+    def __copy(self, node):
+        copy = self.__node_class()
+        dict.update(copy, dict.items(node))
+        return copy
+
+    def subscribe(self, path, callback):
+        """
+        Call callback(changes) with the ChangeSet of a load or reload that
+        changed path, a path above it or a path below it. A ref counts as
+        changed when a path it reads changed, so subscribers of the ref and
+        of the refs reading it are called too. Returns a function that
+        cancels the subscription
+        """
+        with self.__reload_lock:
+            self.__subscribers.add(path, callback)
+
+        def unsubscribe():
+            with self.__reload_lock:
+                self.__subscribers.discard(path, callback)
+
+        return unsubscribe
+
+    def reload(self):
+        """
+        Re-parse the files that changed since they were loaded and swap in a
+        new snapshot. Only the top level keys a changed file had or has are
+        merged again, the rest of the tree is shared with the old snapshot.
+        The snapshot is built on the side, so readers see either the old or
+        the new configuration, never a partial update. Values set on the
+        configuration since it was loaded may be dropped.
+        Returns the ChangeSet of the paths that changed
+        """
+        with self.__reload_lock:
+            old_layers = self.__layers
+            layers = []
+            keys = set()
+            for layer in old_layers:
+                if file_stamp(layer.name) != layer.stamp:
+                    keys.update(layer.raw)
+                    layer = self.__read(layer.name)
+                    keys.update(layer.raw)
+                layers.append(layer)
+
+            if all(a is b for a, b in zip(layers, old_layers)):
+                return ChangeSet()
+
+            for old, layer in zip(old_layers, layers):
+                if old is not layer:
+                    self.__index_refs(old, self.__refs.discard)
+                    self.__index_refs(layer, self.__refs.add)
+
+            if self.__resolve == 'eager':
+                # Resolved refs anywhere may read the changed keys
+                raw, parsed = self.__merge_all(layers)
+            else:
+                with timed(self.__stats, 'merge'):
+                    raw, parsed = self.__merge_keys(layers, keys)
+            self._compile(parsed)
+
+            changes = ChangeSet.diff(self.__raw, raw, keys)
+            self.__layers = layers
+            self.__raw, self.__parsed = raw, parsed
+            changes, callbacks = self.__dispatch(changes)
+
+        _call(callbacks, changes)
+        return changes
+
+    def __dispatch(self, changes):
+        """
+        Add the refs that read a changed path to changes and find the
+        subscribers of the changed paths. Both are looked up in path tries,
+        so the cost follows the changed paths, not the subscriptions
+        """
+        if not changes:
+            return changes, []
+
+        paths = changes.paths
+        dependents = set()
+        stack = list(paths)
+        while stack:
+            for location in self.__refs.match(stack.pop()):
+                if (location not in paths and location not in dependents and
+                        is_ref(self.__raw, location)):
+                    dependents.add(location)
+                    stack.append(location)
+
+        if dependents:
+            changes = ChangeSet(changes.added, changes.removed,
+                                changes.modified | dependents)
+
+        callbacks = []
+        seen = set()
+        for path in changes.paths:
+            for callback in self.__subscribers.match(path):
+                if callback not in seen:
+                    seen.add(callback)
+                    callbacks.append(callback)
+
+        return changes, callbacks
+
+    @staticmethod
+    def __index_refs(layer, update):
+        for location, target in layer.refs:
+            update(target, location)
+
+    def __merge_all(self, layers):
+        raw = {}
+        parsed = self.__node_class()
+        with timed(self.__stats, 'merge'):
+            for layer in layers:
+                self.__raw_merger.update(raw, layer.raw)
+                self.__merger.update(parsed, layer.parsed)
+
+        return raw, parsed
+
+    def __merge_keys(self, layers, keys):
+        raw = dict(self.__raw)
+        parsed = self.__copy(self.__parsed)
+        for key in keys:
+            # Merge the key again from every file that has it, in order
+            found = [layer for layer in layers if key in layer.raw]
+            if found:
+                raw[key] = self.__raw_merger.fold(
+                    [layer.raw[key] for layer in found])
+                _store(parsed, key, self.__merger.fold(
+                    [layer.parsed[key] for layer in found]))
+            else:
+                raw.pop(key, None)
+                dict.pop(parsed, key, None)
+
+        return raw, parsed
+
+    def close(self):
+        "Stop watching the files for changes"
+        if self.__watcher is not None:
+            self.__watcher.stop()
+            self.__watcher = None
+
+    def __load(self, cfg_file):
+        self._add(self.__read(cfg_file))
+
+    def __read(self, cfg_file):
+        if _is_compiled(cfg_file):
+            return _compiled_layer(cfg_file)
+
+        # Stamped before reading, so a write racing the read is seen as a
+        # change on the next reload
+        stamp = file_stamp(cfg_file)
+        with timed(self.__stats, 'read', cfg_file):
+            with open(cfg_file) as f:
+                data = f.read()
+
+        if self.__executor is None:
+            raw, parsed = self._parse(data, cfg_file)
+        else:
+            # Build the !!object/call objects concurrently after parsing
+            with collect_calls() as calls:
+                raw, parsed = self._parse(data, cfg_file)
+            with timed(self.__stats, 'calls', cfg_file):
+                call_all(calls, self.__executor)
+
+        return _Layer(cfg_file, stamp, raw, parsed)
+
+    def _parse(self, data, name):
         tags = TagRegistry()
-        tags.setup_yaml(yaml)
-
-        with open(cfg_file) as f:
-            data = f.read()
-            # yaml.safe_load loads with none of the custom tags
-            try:
-                self.__raw.update(yaml.safe_load(data))
-            except ValueError as e:
-                raise ConfigurationError(*e.args)
-
-            # yaml.load loads with all the custom tags we have registered
-            try:
-                self.__parsed.update(yaml.load(data))
-            except yaml.YAMLError as e:
-                raise ConfigurationError(e.problem)
+        stats = self.__stats
+        loader = tags.loader(self.__loader, timed=stats is not None)
+
+        if self.__cache is None:
+            return parse(data, loader, name, stats)
+
+        with timed(stats, 'cache', name):
+            document = self.__cache.get(data, tags.signature)
+        if document is None:
+            document = parse(data, loader, name, stats)
+            self.__cache.set(data, document, tags.signature)
+
+        return document
+
+    def _add(self, layer):
+        with self.__reload_lock:
+            self.__layers.append(layer)
+            self.__index_refs(layer, self.__refs.add)
+            with timed(self.__stats, 'merge', layer.name):
+                self.__raw_merger.update(self.__raw, layer.raw)
+                self.__merger.update(self.__parsed, layer.parsed)
+
+    def _start(self, watch):
+        "Called once the files are loaded"
+        if self.__access is not None:
+            # Only the reads made by the application count
+            self.__access.reset()
+
+        if watch:
+            self.__watcher = Watcher(self, watch)
+            self.__watcher.start()
+
+    def _compile(self, parsed=None):
+        parsed = self.__parsed if parsed is None else parsed
+        # With resolve='eager' every ref is replaced by its value up front,
+        # so bad refs fail here and reads never pay for resolution
+        if self.__resolve == 'eager':
+            with timed(self.__stats, 'resolve'):
+                RefGraph(parsed).resolve()
+        if self.__access is not None:
+            self.__node_class._label(parsed)
 
     def __iter__(self):
         # py3 yield from self.__parsed.items()
@@ -51,8 +382,11 @@ class Configuration(object):
         return len(self.__parsed)
 
     def __getattr__(self, name):
-        if hasattr(self.__parsed, name):
-            return getattr(self.__parsed, name)
+        # Read the snapshot once, a reload may swap it at any time
+        parsed = self.__parsed
+        value = getattr(parsed, name, _missing)
+        if value is not _missing:
+            return value
 
         try:
             return super(Configuration, self).__getattribute__(name)
@@ -60,46 +394,483 @@ class Configuration(object):
             raise ConfigurationError(*e.args)
 
     def __str__(self):
-        return yaml.dump(self.__parsed, default_flow_style=False, indent=2,
+        dumper = TagRegistry().dumper(yaml.Dumper)
+        return yaml.dump(self.__parsed, Dumper=dumper,
+                         default_flow_style=False, indent=2,
                          allow_unicode=True)
 
     def __repr__(self):
         return repr(self.__raw)
 
 
+class _Layer(object):
+    """
+    One loaded file: its name, file_stamp, both parsed views and the
+    (location, target) of its refs
+    """
+    __slots__ = ('name', 'stamp', 'raw', 'parsed', 'refs')
+
+    def __init__(self, name, stamp, raw, parsed):
+        self.name = name
+        self.stamp = stamp
+        self.raw = raw
+        self.parsed = parsed
+        self.refs = list(ref_targets(parsed))
+
+
+def _is_compiled(cfg_file):
+    # cfg_file may be a path object, like open() takes
+    fspath = getattr(os, 'fspath', str)
+    return fspath(cfg_file).endswith(COMPILED_SUFFIX)
+
+
+def _compiled_layer(cfg_file):
+    """
+    Layer of a file compiled by `configuration compile`. The file is mapped
+    and its mappings are used as they are, so only the values that are read
+    are decoded
+    """
+    stamp = file_stamp(cfg_file)
+    root = Snapshot.load(cfg_file).root
+    return _Layer(cfg_file, stamp, root, root)
+
+
+def _call(callbacks, changes):
+    for callback in callbacks:
+        try:
+            callback(changes)
+        except Exception:
+            # One failing subscriber does not keep the others from running
+            log.exception('Configuration subscriber %r failed', callback)
+
+
+def _evolve_document(raw, changes):
+    """
+    The document merged deep over the configuration by evolve(). Digits
+    index the lists of the tree, like in refs
+    """
+    paths = set(tuple(path.split('.')) for path in changes)
+    for names in paths:
+        for i in range(1, len(names)):
+            if names[:i] in paths:
+                msg = 'evolve() got overlapping paths {} and {}'
+                raise ConfigurationError(msg.format('.'.join(names[:i]),
+                                                    '.'.join(names)))
+
+    document = {}
+    for path, value in changes.items():
+        names = path.split('.')
+        node, base = document, raw
+        for name in names[:-1]:
+            key = _evolve_key(base, name, path)
+            base = _evolve_child(base, key)
+            node = node.setdefault(key, ListItems() if _is_list(base) else {})
+        node[_evolve_key(base, names[-1], path)] = Merge('replace', value)
+
+    return document
+
+
+def _evolve_key(base, name, path):
+    if not _is_list(base):
+        return name
+    if not name.isdigit() or int(name) >= len(base):
+        raise ConfigurationError('Unable to find {}'.format(path))
+
+    return int(name)
+
+
+def _evolve_child(base, key):
+    if _is_list(base):
+        return base[key]
+    elif isinstance(base, Mapping):
+        return base.get(key)
+
+    return None
+
+
+def _check_options(options):
+    if options:
+        msg = 'Configuration() got an unexpected keyword argument {!r}'
+        raise TypeError(msg.format(sorted(options)[0]))
+
+
 class _YAMLObj(dict):
+    """
+    dict whose keys can also be read as attributes.
+    The dict itself is the only storage, there is no instance __dict__, so
+    attribute reads are served from the dict and keys shadow dict methods
+    """
+    __slots__ = ('_watchers',)
+
     def __init__(self, obj=None, **kwargs):
         super(_YAMLObj, self).__init__()
+        _set_watchers(self, None)
         self.update(obj)
         self.update(**kwargs)
 
     def update(self, other=None, **kwargs):
-        if isinstance(other, collections.Mapping):
+        if isinstance(other, dict):
+            # The stored values, not read through the node
+            self.update(**dict(dict.items(other)))
+        elif isinstance(other, Mapping):
             self.update(**other)
 
         for k, v in kwargs.items():
             setattr(self, k, v)
 
     def __setattr__(self, name, value):
-        if isinstance(value, collections.Mapping):
-            value = self.__class__(value)
+        _store(self, name, type(self)._wrap(value))
+
+    @classmethod
+    def _wrap(cls, value):
+        "value as it is stored in a node"
+        if isinstance(value, Merge):
+            value = value.value
+
+        if isinstance(value, (SnapshotMapping, SnapshotList)):
+            # Read only views of a compiled file, kept unwrapped
+            return value
+        elif isinstance(value, Mapping):
+            value = cls(value)
         elif isinstance(value, (list, tuple)):
-            value = [self.__class__(x)
-                     if isinstance(x, dict) else x for x in value]
+            value = [cls(x) if isinstance(x, dict) else x for x in value]
 
-        super(_YAMLObj, self).__setattr__(name, value)
-        super(_YAMLObj, self).__setitem__(name, value)
+        return value
 
     def __getattribute__(self, name):
         "Emulate type_getattro() in Objects/typeobject.c"
-        v = super(_YAMLObj, self).__getattribute__(name)
+        v = _dict_get(self, name, _missing)
+        if v is _missing:
+            return object.__getattribute__(self, name)
 
-        if hasattr(v, '__get__'):
+        if type(v) in _descriptor_types:
             return v.__get__(self, _YAMLObj)
 
         return v
 
+    def __delattr__(self, name):
+        try:
+            _dict_delitem(self, name)
+        except KeyError:
+            raise AttributeError(name)
+
+        _notify(self, name)
+
+    def __reduce__(self):
+        return type(self), (), None, None, iter(dict.items(self))
+
+    def _watch(self, name, ref):
+        """
+        Register ref to be invalidated when name is set or deleted and
+        return the value currently stored under name
+        """
+        watchers = _get_watchers(self)
+        if watchers is None:
+            watchers = {}
+            _set_watchers(self, watchers)
+
+        refs = watchers.get(name)
+        if refs is None:
+            refs = watchers[name] = WeakSet()
+        refs.add(ref)
+
+        return _dict_get(self, name)
+
     __setitem__ = __setattr__
     __getitem__ = __getattribute__
 
+
+class _LazyYAMLObj(_YAMLObj):
+    """
+    Keeps nested mappings as the plain dicts they were loaded as and only
+    wraps one the first time it is read, so a config only pays for the
+    parts of the tree that are actually used
+    """
+    __slots__ = ()
+
+    @classmethod
+    def _wrap(cls, value):
+        if isinstance(value, Merge):
+            value = value.value
+
+        if type(value) is dict:
+            return value
+
+        return super(_LazyYAMLObj, cls)._wrap(value)
+
+    def __getattribute__(self, name):
+        v = _dict_get(self, name, _missing)
+        if v is _missing:
+            return object.__getattribute__(self, name)
+
+        if isinstance(v, dict) and not isinstance(v, _YAMLObj):
+            v = _LazyYAMLObj._materialize(self, name)
+        elif type(v) in _descriptor_types:
+            return v.__get__(self, _YAMLObj)
+
+        return v
+
+    def _materialize(self, name):
+        v = _dict_getitem(self, name)
+        if isinstance(v, dict) and not isinstance(v, _YAMLObj):
+            v = type(self)(v)
+            _dict_setitem(self, name, v)
+
+        return v
+
+    def get(self, name, default=None):
+        if _dict_contains(self, name):
+            return _LazyYAMLObj._materialize(self, name)
+
+        return default
+
+    def items(self):
+        return [(k, _LazyYAMLObj._materialize(self, k)) for k in self]
+
+    def values(self):
+        return [_LazyYAMLObj._materialize(self, k) for k in self]
+
+    __getitem__ = __getattribute__
+
+
+class _FrozenYAMLObj(_YAMLObj):
+    """
+    Immutable node: lists are stored as _FrozenList and every method that
+    would change the mapping raises ConfigurationError. A frozen tree never
+    changes, so it is shared between threads, and between the snapshots
+    made by evolve(), without locks or copies
+    """
+    __slots__ = ()
+
+    def __init__(self, obj=None, **kwargs):
+        dict.__init__(self)
+        _set_watchers(self, None)
+        for other in (obj or {}, kwargs):
+            items = dict.items(other) if isinstance(other, dict) else \
+                other.items()
+            for k, v in items:
+                _store(self, k, type(self)._wrap(v))
+
+    @classmethod
+    def _wrap(cls, value):
+        if isinstance(value, _FrozenList):
+            return value
+
+        value = super(_FrozenYAMLObj, cls)._wrap(value)
+        if isinstance(value, list):
+            # The mappings in it are wrapped already, nested lists are not
+            value = _FrozenList(cls._wrap(x) if isinstance(x, (list, tuple))
+                                else x for x in value)
+
+        return value
+
+    def __reduce__(self):
+        return type(self), (dict(dict.items(self)),)
+
+    def _watch(self, name, ref):
+        # Nothing to invalidate, a frozen node never changes
+        return _dict_get(self, name)
+
+    def _frozen(self, *args, **kwargs):
+        raise ConfigurationError('The configuration is frozen, use evolve() '
+                                 'to make a changed copy')
+
+    __setattr__ = __delattr__ = __setitem__ = __delitem__ = _frozen
+    update = pop = popitem = clear = setdefault = _frozen
+
+
+class _FrozenList(tuple):
+    "The lists of a frozen configuration, equal to lists with the same items"
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            other = tuple(other)
+
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = tuple.__hash__
+
+
+def _tracked(node_class, access):
+    """
+    Subclass of node_class counting the reads of its keys on access, an
+    AccessStats. Every node holds the dot separated path of its keys, set
+    for the whole tree when it is compiled and, for the nodes added since
+    (a lazy mapping wrapped, a value set), when they are first read. Reads
+    are counted on the paths, so the counts carry over reloads and evolve
+    without keeping any node alive
+    """
+    seen = access._seen
+    read = node_class.__getattribute__
+
+    def prefix_of(node):
+        try:
+            return slot.__get__(node)
+        except AttributeError:
+            return None
+
+    def label_new(value, prefix, key):
+        "Label value, read as key of a node labelled prefix, if it is new"
+        if type(value) is tracked:
+            if prefix_of(value) is None:
+                slot.__set__(value, '{}{}.'.format(prefix, key))
+        elif (isinstance(value, (list, tuple)) and value and
+              type(value[0]) is tracked):
+            for i, item in enumerate(value):
+                if type(item) is tracked and prefix_of(item) is None:
+                    slot.__set__(item, '{}{}.{}.'.format(prefix, key, i))
+
+    def label(root):
+        "Label every node of the tree at root"
+        stack = [('', root)]
+        done = set()
+        while stack:
+            prefix, node = stack.pop()
+            if id(node) in done:
+                continue
+            done.add(id(node))
+
+            if type(node) is tracked:
+                slot.__set__(node, prefix)
+                children = dict.items(node)
+            else:
+                children = enumerate(node)
+            for key, value in children:
+                if type(value) is tracked or isinstance(value, (list, tuple)):
+                    stack.append(('{}{}.'.format(prefix, key), value))
+
+    def count(prefix, name):
+        "Record a read of name in the node labelled prefix"
+        try:
+            key = prefix + name
+        except TypeError:
+            key = '{}{}'.format(prefix, name)
+        seen.add(key)
+        access._tick -= 1
+        if access._tick <= 0:
+            access._count(key)
+
+    def __getattribute__(self, name):
+        if _dict_contains(self, name):
+            prefix = prefix_of(self)
+            if prefix is not None:
+                count(prefix, name)
+                value = read(self, name)
+                label_new(value, prefix, name)
+                return value
+
+        return read(self, name)
+
+    def __contains__(self, name):
+        found = _dict_contains(self, name)
+        if found:
+            prefix = prefix_of(self)
+            if prefix is not None:
+                count(prefix, name)
+
+        return found
+
+    def __iter__(self):
+        # Overriding it makes dict(node) and **node copy the node through
+        # __getitem__, so their reads are counted too (and refs resolved)
+        return dict.__iter__(self)
+
+    def get(self, name, default=None):
+        value = node_class.get(self, name, default)
+        prefix = prefix_of(self)
+        if prefix is not None and _dict_contains(self, name):
+            count(prefix, name)
+            label_new(value, prefix, name)
+
+        return value
+
+    def items(self):
+        items = node_class.items(self)
+        prefix = prefix_of(self)
+        if prefix is not None:
+            for key, value in items:
+                count(prefix, key)
+                label_new(value, prefix, key)
+
+        return items
+
+    def values(self):
+        items(self)
+        return node_class.values(self)
+
+    def __reduce__(self):
+        # Pickled as the untracked node
+        return (node_class,) + node_class.__reduce__(self)[1:]
+
+    attributes = {
+        '__slots__': ('_access_prefix',),
+        '__getattribute__': __getattribute__,
+        '__getitem__': __getattribute__,
+        '__contains__': __contains__,
+        '__iter__': __iter__,
+        'get': get,
+        'items': items,
+        'values': values,
+        '__reduce__': __reduce__,
+        '_label': staticmethod(label),
+    }
+    tracked = type(node_class.__name__, (node_class,), attributes)
+    slot = tracked.__dict__['_access_prefix']
+
+    return tracked
+
+
+def _store(node, name, value):
+    if hasattr(type(value), '__get__'):
+        _descriptor_types.add(type(value))
+
+    _dict_setitem(node, name, value)
+    _notify(node, name)
+
+
+def _notify(node, name):
+    watchers = _get_watchers(node)
+    if watchers:
+        refs = watchers.pop(name, None)
+        for ref in list(refs or ()):
+            ref._invalidate()
+
+# Types of the stored values that are descriptors (Ref, PythonObject, user
+# tags...). They are recorded when a value is stored so reads of plain
+# values never have to probe the value for __get__
+_descriptor_types = set()
+
+_missing = object()
+_dict_get = dict.get
+_dict_contains = dict.__contains__
+_dict_getitem = dict.__getitem__
+_dict_setitem = dict.__setitem__
+_dict_delitem = dict.__delitem__
+_get_watchers = _YAMLObj._watchers.__get__
+_set_watchers = _YAMLObj._watchers.__set__
+
+
+def _represent_tracked(dumper, node):
+    # Dumping a tracked node is not a read of its keys
+    return dumper.represent_dict(dict(dict.items(node)))
+
 yaml.add_representer(_YAMLObj, yaml.representer.SafeRepresenter.represent_dict)
+yaml.add_representer(_LazyYAMLObj,
+                     yaml.representer.SafeRepresenter.represent_dict)
+yaml.add_representer(_FrozenYAMLObj,
+                     yaml.representer.SafeRepresenter.represent_dict)
+
+# Tracked nodes are subclasses made for each Configuration
+yaml.add_multi_representer(_YAMLObj, _represent_tracked)
+yaml.add_representer(_FrozenList,
+                     yaml.representer.SafeRepresenter.represent_list)
+# The read only views of compiled files
+yaml.add_representer(SnapshotMapping,
+                     yaml.representer.SafeRepresenter.represent_dict)
+yaml.add_representer(SnapshotList,
+                     yaml.representer.SafeRepresenter.represent_list)
@@ -0,0 +1,66 @@
+
+import os
+import sys
+import hashlib
+import tempfile
+
+try:
+    import cPickle as pickle
+except ImportError:  # py3
+    import pickle
+
+from ._version import __version__
+from .errors import ConfigurationError
+
+__all__ = []
+
+
+class ConfigCache(object):
+    """
+    On-disk cache of parsed configuration files.
+    Entries are keyed on the file content, the library version, the python
+    version and the registered tags, so a stale entry is never read back.
+    Custom tags are pickled in their unresolved form (a Ref keeps its path,
+    a PythonObject its import path and arguments) and get rebuilt when the
+    entry is loaded.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def key(self, data, tags=''):
+        digest = hashlib.sha256()
+        digest.update('{}:{}.{}:'.format(__version__,
+                                         *sys.version_info[:2]).encode())
+        digest.update(tags.encode('utf-8') + b':')
+        digest.update(data.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, data, tags=''):
+        try:
+            with open(self._entry(data, tags), 'rb') as f:
+                return pickle.load(f)
+        except ConfigurationError:
+            raise
+        except Exception:
+            # A missing, partial or unreadable entry is just a cache miss
+            return None
+
+    def set(self, data, document, tags=''):
+        tmp = None
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(document, f, pickle.HIGHEST_PROTOCOL)
+            # rename is atomic so readers never see a partial entry
+            os.rename(tmp, self._entry(data, tags))
+        except Exception:
+            # Unwritable cache dirs and documents holding objects that can
+            # not be pickled (e.g. !!python/name:sys.stdout) are not cached
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _entry(self, data, tags):
+        return os.path.join(self.path, self.key(data, tags) + '.pickle')
@@ -0,0 +1,75 @@
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # py2
+    from collections import Mapping
+
+__all__ = ['ChangeSet']
+
+
+class ChangeSet(object):
+    """
+    The dot separated paths added, removed and modified by a reload.
+    A mapping that changed is reported through the paths that changed inside
+    it, any other value as a whole. Empty, and so falsy, when nothing changed
+    """
+    def __init__(self, added=(), removed=(), modified=()):
+        self.added = frozenset(added)
+        self.removed = frozenset(removed)
+        self.modified = frozenset(modified)
+
+    @classmethod
+    def diff(cls, old, new, keys=None):
+        "ChangeSet between two mappings, optionally only for some keys"
+        changes = ([], [], [])
+        if keys is None:
+            keys = set(old) | set(new)
+
+        for key in keys:
+            _compare(key, old.get(key, _missing), new.get(key, _missing),
+                     changes)
+
+        return cls(*changes)
+
+    @property
+    def paths(self):
+        return self.added | self.removed | self.modified
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified)
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        if not isinstance(other, ChangeSet):
+            return NotImplemented
+
+        return (self.added, self.removed, self.modified) == (
+            other.added, other.removed, other.modified)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'ChangeSet(added={}, removed={}, modified={})'.format(
+            sorted(self.added), sorted(self.removed), sorted(self.modified))
+
+
+def _compare(path, old, new, changes):
+    added, removed, modified = changes
+    if old is _missing and new is _missing:
+        return
+    elif old is _missing:
+        added.append(path)
+    elif new is _missing:
+        removed.append(path)
+    elif isinstance(old, Mapping) and isinstance(new, Mapping):
+        for key in set(old) | set(new):
+            _compare('{}.{}'.format(path, key), old.get(key, _missing),
+                     new.get(key, _missing), changes)
+    elif type(old) is not type(new) or old != new:
+        modified.append(path)
+
+_missing = object()
@@ -0,0 +1,184 @@
+
+from .errors import ConfigurationError
+from .tags.ref import Ref
+
+__all__ = []
+
+
+class RefGraph(object):
+    """
+    Resolves every Ref in a config tree ahead of time and replaces it with
+    its value.
+    Refs are resolved depth first, so every Ref is resolved after the Refs it
+    reads through (a topological order of the ref graph) and a Ref that is
+    met again while it is still being resolved closes a cycle. Cycles and
+    missing targets are collected and reported together, with the file and
+    line of every Ref involved.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.values = {}
+        self.errors = []
+
+    def resolve(self):
+        _unshare(self.root)
+        for node, key, ref in list(_refs(self.root)):
+            try:
+                value = self._resolve(ref, node, [])
+            except _Unresolved:
+                continue
+
+            dict.__setitem__(node, key, value)
+
+        if self.errors:
+            msg = 'Unable to resolve refs:\n  {}'
+            raise ConfigurationError(msg.format('\n  '.join(self.errors)))
+
+    def _resolve(self, ref, base, stack):
+        key = (id(ref), id(base))
+        value = self.values.get(key, _pending)
+        if value is _visiting:
+            cycle = stack[stack.index(ref):] + [ref]
+            self.errors.append('Circular ref {}'.format(
+                ' -> '.join(_describe(r) for r in cycle)))
+            raise _Unresolved()
+        elif value is _failed:
+            raise _Unresolved()
+        elif value is not _pending:
+            return value
+
+        self.values[key] = _visiting
+        stack.append(ref)
+        try:
+            value = base
+            for name, index in ref._path.keys:
+                value = self._step(value, name, index, ref, stack)
+
+            if isinstance(value, str):
+                suffix = ref.suffix
+                if isinstance(suffix, Ref):
+                    suffix = self._resolve(suffix, base, stack)
+
+                value += '{}'.format(suffix)
+        except _Unresolved:
+            self.values[key] = _failed
+            raise
+        finally:
+            stack.pop()
+
+        self.values[key] = value
+        return value
+
+    def _step(self, obj, name, index, ref, stack):
+        if index is not None and isinstance(obj, (list, tuple)):
+            try:
+                return obj[index]
+            except IndexError:
+                return self._missing(ref)
+        elif isinstance(obj, dict):
+            value = dict.get(obj, name, _pending)
+            if value is _pending:
+                return self._missing(ref)
+            elif isinstance(value, Ref):
+                return self._resolve(value, obj, stack)
+            elif hasattr(type(value), '__get__'):
+                return value.__get__(obj, type(obj))
+
+            return value
+
+        try:
+            return getattr(obj, name)
+        except AttributeError:
+            return self._missing(ref)
+
+    def _missing(self, ref):
+        self.errors.append('Unable to find {}'.format(_describe(ref)))
+        raise _Unresolved()
+
+
+class _Unresolved(Exception):
+    pass
+
+
+def _refs(root):
+    "Yield (node, key, ref) for every Ref stored in a mapping of the tree"
+    seen = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, dict):
+            for key, value in dict.items(obj):
+                if isinstance(value, Ref):
+                    yield obj, key, value
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
+        elif isinstance(obj, list):
+            stack.extend(x for x in obj if isinstance(x, (dict, list)))
+
+
+def _unshare(root):
+    """
+    Copy the plain dicts holding refs, and the dicts and lists above them,
+    into the nodes that hold them. With lazy=True they are the dicts the
+    files were loaded as, shared with the loaded files, and resolving writes
+    the values in place
+    """
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        items = dict.items(obj) if isinstance(obj, dict) else enumerate(obj)
+        for key, value in list(items):
+            if type(value) is dict:
+                copy = _copy_refs(value)
+                if copy is not value:
+                    _set(obj, key, copy)
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+
+
+def _copy_refs(value):
+    "value with the dicts and lists on the way to its refs copied"
+    if isinstance(value, dict):
+        items = dict.items(value)
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return value
+
+    copy = None
+    for key, item in items:
+        if isinstance(item, Ref):
+            if copy is None:
+                copy = dict(value) if isinstance(value, dict) else list(value)
+            continue
+
+        item_copy = _copy_refs(item)
+        if item_copy is not item:
+            if copy is None:
+                copy = dict(value) if isinstance(value, dict) else list(value)
+            copy[key] = item_copy
+
+    return value if copy is None else copy
+
+
+def _set(obj, key, value):
+    if isinstance(obj, dict):
+        dict.__setitem__(obj, key, value)
+    else:
+        obj[key] = value
+
+
+def _describe(ref):
+    if ref._mark is None:
+        return ref.ref
+
+    return '{} ({})'.format(ref.ref, '{}'.format(ref._mark).strip())
+
+
+_pending = object()
+_visiting = object()
+_failed = object()
@@ -0,0 +1,97 @@
+
+import yaml
+
+from yaml.constructor import SafeConstructor
+
+from ._stats import timed
+from .errors import ConfigurationError
+from .tags._base import _safe_unknown
+from .tags.merge import Merge
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # py2
+    from collections import Mapping
+
+__all__ = []
+
+BACKENDS = ('auto', 'c', 'python')
+
+
+def loader_class(backend='auto'):
+    """
+    Pick the yaml Loader for a backend name.
+    'c' uses libyaml's CLoader, 'python' the pure python Loader and 'auto'
+    uses CLoader when libyaml is available and falls back to Loader.
+    """
+    if backend not in BACKENDS:
+        msg = 'Unknown backend {!r}, expected one of {}'
+        raise ConfigurationError(msg.format(backend, ', '.join(BACKENDS)))
+
+    c_loader = getattr(yaml, 'CLoader', None)
+    if backend == 'python' or (backend == 'auto' and c_loader is None):
+        return yaml.Loader
+
+    if c_loader is None:
+        raise ConfigurationError('The c backend requires PyYAML built '
+                                 'with libyaml')
+
+    return c_loader
+
+
+def parse(data, Loader=yaml.Loader, name=None, stats=None):
+    """
+    Parse a YAML document once and construct both views of it from the
+    resulting node graph.
+
+    Returns a ``(raw, parsed)`` tuple. ``raw`` is built with the safe
+    constructors, so unknown tags are kept as strings; ``parsed`` is built
+    with every tag registered in the TagRegistry. ``name`` is the file name
+    used in marks. The parse, raw and construct phases are timed on
+    ``stats``, a LoadStats, when one is given.
+    """
+    loader = Loader(data)
+    if name:
+        loader.name = name
+    loader.stats = stats
+    try:
+        with timed(stats, 'parse', name):
+            node = loader.get_single_node()
+        if node is None:
+            return {}, {}
+
+        # RawConstructor has none of the custom tags
+        with timed(stats, 'raw', name):
+            raw = RawConstructor().construct_document(node)
+        _check_mapping(raw)
+
+        # Loader has all the custom tags we have registered
+        with timed(stats, 'construct', name):
+            parsed = loader.construct_document(node)
+    except yaml.YAMLError as e:
+        raise ConfigurationError(_problem(e))
+    finally:
+        loader.dispose()
+
+    return raw, parsed
+
+
+class RawConstructor(SafeConstructor):
+    """
+    SafeConstructor keeping unknown tags as strings. !!merge is kept as the
+    value it wraps, so the raw files merge like the parsed ones
+    """
+
+RawConstructor.add_constructor(None, _safe_unknown)
+RawConstructor.add_multi_constructor('tag:yaml.org,2002:merge:',
+                                     Merge.construct)
+
+
+def _check_mapping(data):
+    if not isinstance(data, Mapping):
+        msg = 'Expected a mapping at the top level, got {}'
+        raise ConfigurationError(msg.format(type(data).__name__))
+
+
+def _problem(error):
+    return getattr(error, 'problem', None) or '{}'.format(error)
@@ -0,0 +1,157 @@
+
+from functools import partial
+
+from .errors import ConfigurationError
+from .tags.merge import Merge
+
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:  # py2
+    from collections import Mapping, Sequence
+
+try:
+    string_types = (basestring, bytes)
+except NameError:  # py3
+    string_types = (str, bytes)
+
+__all__ = []
+
+MAP_STRATEGIES = ('replace', 'deep')
+LIST_STRATEGIES = ('replace', 'append', 'unique')
+
+
+class Merger(object):
+    """
+    Merges the documents of the loaded files in one pass over both trees.
+    Top level keys are always merged; below them mappings are replaced or
+    merged deep (maps) and lists replaced, appended or appended without
+    duplicates (lists). A !!merge:<strategy> tag overrides the strategy for
+    one value.
+    A merge never changes its inputs: mappings both trees have are merged
+    into a new one, and subtrees only the earlier tree has are shared with
+    it. new, wrap and store build the result (nodes for the parsed view)
+    """
+    def __init__(self, maps='replace', lists='replace', new=dict,
+                 wrap=None, store=dict.__setitem__):
+        _check_strategy('merge', maps, MAP_STRATEGIES)
+        _check_strategy('lists', lists, LIST_STRATEGIES)
+
+        self.maps = maps
+        self.lists = lists
+        self.new = new
+        self.wrap = wrap or _plain
+        self.store = store
+
+    def update(self, root, document):
+        "Merge the top level keys of document into root"
+        for key, value in document.items():
+            self.store(root, key, self.merge(dict.get(root, key, _missing),
+                                             value))
+
+    def merge(self, base, value):
+        "The value merged over base, _missing if there is no base"
+        strategy = None
+        if isinstance(value, Merge):
+            strategy, value = value.strategy, value.value
+
+        if base is _missing:
+            return self.build(value)
+
+        if isinstance(value, Mapping) and isinstance(base, Mapping):
+            if (strategy or self.maps) == 'deep':
+                return self._merge_mapping(base, value)
+        elif isinstance(value, ListItems) and _is_list(base):
+            merged = list(base)
+            for index, item in value.items():
+                merged[index] = self.merge(merged[index], item)
+            return self._list(base, merged)
+        elif _is_list(value) and _is_list(base):
+            strategy = strategy or self.lists
+            if strategy == 'append':
+                return self._list(base, list(base) + list(self.build(value)))
+            elif strategy == 'unique':
+                merged = list(base)
+                for item in self.build(value):
+                    if item not in merged:
+                        merged.append(item)
+                return self._list(base, merged)
+
+        return self.build(value)
+
+    def fold(self, values):
+        "The values, at least one, merged in order"
+        merged = self.build(values[0])
+        for value in values[1:]:
+            merged = self.merge(merged, value)
+
+        return merged
+
+    def build(self, value):
+        "value ready to be stored in the result"
+        return self.wrap(value)
+
+    def _list(self, base, merged):
+        if isinstance(base, (list, tuple)):
+            return type(base)(merged)
+
+        # A list of a compiled file, read only, the result is built anew
+        return self.build(merged)
+
+    def _merge_mapping(self, base, value):
+        merged = self.new()
+        # Stored values are copied as they are, reading them through a node
+        # would resolve refs and build lazy objects
+        if isinstance(base, dict):
+            items, get = dict.items(base), partial(dict.get, base)
+        else:  # a mapping of a compiled file
+            items, get = base.items(), base.get
+
+        for key, item in items:
+            self.store(merged, key, item)
+        for key, item in value.items():
+            self.store(merged, key, self.merge(get(key, _missing), item))
+
+        return merged
+
+
+class ListItems(dict):
+    "Values merged over the items of a list, by index"
+
+
+def _is_list(value):
+    return isinstance(value, Sequence) and not isinstance(value, string_types)
+
+
+def _plain(value):
+    """
+    value with every !!merge in it unwrapped. The mappings and lists on the
+    way to one are copied, the rest is returned as it is
+    """
+    if isinstance(value, Merge):
+        value = value.value
+
+    if isinstance(value, dict):
+        items = dict.items(value)
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return value
+
+    copy = None
+    for key, item in items:
+        plain = _plain(item)
+        if plain is not item:
+            if copy is None:
+                copy = dict(value) if isinstance(value, dict) else list(value)
+            copy[key] = plain
+
+    return value if copy is None else copy
+
+
+def _check_strategy(option, strategy, strategies):
+    if strategy not in strategies:
+        msg = 'Unknown {} strategy {!r}, expected one of {}'
+        raise ConfigurationError(msg.format(option, strategy,
+                                            ', '.join(strategies)))
+
+_missing = object()
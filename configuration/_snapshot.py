@@ -0,0 +1,608 @@
+
+import os
+import sys
+import mmap
+import zlib
+import struct
+import datetime
+import tempfile
+
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:  # py2
+    from collections import Mapping, Sequence
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # before python 3.8
+    shared_memory = None
+
+from .errors import ConfigurationError
+from .tags.ref import Ref
+
+__all__ = ['Snapshot']
+
+MAGIC = b'CFGS'
+VERSION = 3
+# Version 3 added dates, datetimes, bytes and big ints, version 2 files
+# only have the other kinds and read the same
+VERSIONS = (2, 3)
+
+_text = type(u'')
+# py2 ints outside a machine word are longs
+_integer_types = (int, type(2 ** 64))
+_header = struct.Struct('<4sBxxxII')
+_u32 = struct.Struct('<I')
+_pair = struct.Struct('<II')
+_slot = struct.Struct('<III')
+_int = struct.Struct('<q')
+_float = struct.Struct('<d')
+_date = struct.Struct('<HBB')
+_datetime = struct.Struct('<HBBBBBIib')
+
+# Fixed offset timezones for the datetimes read back, py2 has none
+_timezone = getattr(datetime, 'timezone', None)
+
+
+class Snapshot(object):
+    """
+    Read only view of the plain data of a configuration stored in one flat
+    buffer: bytes, a file mapped with mmap or a block of shared memory.
+    Values are decoded from the buffer when they are read, so processes
+    attached to the same buffer share it instead of each holding a copy of
+    the tree. Refs are stored resolved and objects are left out, or raise
+    ConfigurationError with strict=True. Dates, datetimes, bytes and ints
+    of any size are kept.
+
+    Mappings and lists read as SnapshotMapping and SnapshotList, with
+    attribute access like the configuration itself. Any other value, and a
+    key that is not a string, raises ConfigurationError naming its path.
+    A snapshot written with
+    index=True also has a hash table of every dot separated path, so
+    lookup(path) and the reads of nested keys are O(1) however large the
+    mappings are
+    """
+    def __init__(self, buffer, _closers=()):
+        self._buffer = memoryview(buffer)
+        self._closers = list(_closers)
+        try:
+            magic, version, root, index = _header.unpack_from(self._buffer)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version not in VERSIONS:
+            raise ConfigurationError('Not a configuration snapshot')
+
+        self._index = _Index(self._buffer, index) if index else None
+        self.root = _read(self._buffer, root, self._index, '')
+
+    @staticmethod
+    def dumps(config, index=False, strict=False):
+        "Encode the plain data of a Configuration (or a mapping)"
+        return _Writer(index, strict).dumps(config)
+
+    @classmethod
+    def save(cls, config, path, index=False, strict=False):
+        "Write the snapshot of config to path, atomically"
+        data = cls.dumps(config, index, strict)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(tmp, path)
+        except Exception:
+            os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        "Map the snapshot file at path read only"
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(mapped, [mapped.close])
+
+    @classmethod
+    def share(cls, config, name=None):
+        """
+        Copy the snapshot of config into a new block of shared memory.
+        Other processes attach to it by its shared_name; the creating
+        process calls unlink() once it is no longer needed
+        """
+        data = cls.dumps(config)
+        shm = _shared_memory(name=name, create=True, size=len(data))
+        shm.buf[:len(data)] = data
+
+        snapshot = cls(shm.buf, [shm.close])
+        snapshot._shm = shm
+        return snapshot
+
+    @classmethod
+    def attach(cls, name):
+        "Attach to the shared memory snapshot called name"
+        shm = _shared_memory(name=name)
+        snapshot = cls(shm.buf, [shm.close])
+        snapshot._shm = shm
+        return snapshot
+
+    root = None
+    _shm = None
+    _index = None
+
+    def lookup(self, path):
+        "The value at a dot separated path, KeyError if there is none"
+        if self._index is not None:
+            offset = self._index.find(path)
+            if offset is None:
+                raise KeyError(path)
+            return _read(self._buffer, offset, self._index, path + '.')
+
+        value = self.root
+        for name in path.split('.'):
+            try:
+                value = value[int(name) if isinstance(value, SnapshotList)
+                              else name]
+            except (IndexError, KeyError, TypeError, ValueError):
+                raise KeyError(path)
+
+        return value
+
+    @property
+    def shared_name(self):
+        "The name other processes attach() with, for shared snapshots"
+        return self._shm.name if self._shm is not None else None
+
+    def unlink(self):
+        if self._shm is not None:
+            self._shm.unlink()
+
+    def close(self):
+        """
+        Release the buffer. Views read from the snapshot must be dropped
+        first, they keep the buffer exported
+        """
+        self.root = None
+        self._buffer.release()
+        for close in self._closers:
+            close()
+        self._closers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self.root, name)
+
+    def __getitem__(self, key):
+        return self.root[key]
+
+    def __contains__(self, key):
+        return key in self.root
+
+    def __iter__(self):
+        return iter(self.root)
+
+    def __len__(self):
+        return len(self.root)
+
+
+class SnapshotMapping(Mapping):
+    """
+    A mapping of a Snapshot. Keys are found through the path index of the
+    snapshot when it has one, by bisection of the sorted keys otherwise
+    """
+    __slots__ = ('_buffer', '_offset', '_count', '_index', '_prefix')
+
+    def __init__(self, buffer, offset, index=None, prefix=None):
+        self._buffer = buffer
+        self._offset = offset + 5
+        self._count = _u32.unpack_from(buffer, offset + 1)[0]
+        self._index = index
+        self._prefix = prefix
+
+    def __getitem__(self, key):
+        if not isinstance(key, (str, _text)):
+            raise KeyError(key)
+
+        if self._prefix is not None and '.' not in key:
+            path = self._prefix + key
+            offset = self._index.find(path)
+            if offset is None:
+                raise KeyError(key)
+            return _read(self._buffer, offset, self._index, path + '.')
+
+        target = _encode(key)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_offset, value_offset = self._entry(mid)
+            name = _string_bytes(self._buffer, key_offset)
+            if name < target:
+                lo = mid + 1
+            elif name > target:
+                hi = mid
+            else:
+                return _read(self._buffer, value_offset, self._index,
+                             _child(self._prefix, key))
+
+        raise KeyError(key)
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield _read(self._buffer, self._entry(i)[0])
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def _entry(self, i):
+        return _pair.unpack_from(self._buffer, self._offset + i * _pair.size)
+
+
+class SnapshotList(Sequence):
+    "A list of a Snapshot"
+    __slots__ = ('_buffer', '_offset', '_count', '_index', '_prefix')
+
+    def __init__(self, buffer, offset, index=None, prefix=None):
+        self._buffer = buffer
+        self._offset = offset + 5
+        self._count = _u32.unpack_from(buffer, offset + 1)[0]
+        self._index = index
+        self._prefix = prefix
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+
+        offset = _u32.unpack_from(self._buffer,
+                                  self._offset + index * _u32.size)[0]
+        return _read(self._buffer, offset, self._index,
+                     _child(self._prefix, '{}'.format(index)))
+
+    def __len__(self):
+        return self._count
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, SnapshotList)):
+            return NotImplemented
+
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class _Writer(object):
+    """
+    Encodes a tree of plain data. Every value is one type byte followed by
+    its payload:
+      N none, T true, F false, I int64, D float64,
+      S string (u32 length, utf-8), X bytes (u32 length, data),
+      B int outside int64 (u32 length, decimal ascii),
+      Y date (u16 year, u8 month, u8 day),
+      W datetime (u16 year, u8 month, day, hour, minute and second,
+        u32 microsecond, i32 utc offset in seconds, i8 1 when it has one),
+      L list (u32 count, u32 offset of each item),
+      M mapping (u32 count, u32 key offset and u32 value offset per item,
+        sorted by the utf-8 key)
+    Containers are written after their items, strings and subtrees met more
+    than once are written once.
+    The path index is an open addressing hash table: u32 slot count (a
+    power of two), then per slot the u32 crc32 of the path, the u32 offset
+    of the path string and the u32 offset of the value (0 for an empty
+    slot), probed linearly. Keys with a dot are left out of it, their paths
+    would be ambiguous
+    """
+    def __init__(self, index=False, strict=False):
+        self.index = index
+        self.strict = strict
+        self.data = bytearray(_header.size)
+        self.strings = {}
+        self.written = {}
+        self.active = set()
+        # Keeps the written containers alive, so their ids are not reused
+        self.keep = []
+
+    def dumps(self, config):
+        root = config._root() if hasattr(type(config), '_root') else config
+        offset = self.write(root)
+        index = self._write_index(offset) if self.index else 0
+        _header.pack_into(self.data, 0, MAGIC, VERSION, offset, index)
+        return bytes(self.data)
+
+    def _write_index(self, root):
+        # Read from a copy, the path strings are appended to self.data
+        found = list(_paths(memoryview(bytes(self.data)), root, ''))
+        paths = [(self.string(path), _hash(_encode(path)), offset)
+                 for path, offset in found]
+
+        size = 8
+        while size < 2 * len(paths):
+            size *= 2
+        slots = [None] * size
+        for path, digest, offset in paths:
+            i = digest & (size - 1)
+            while slots[i] is not None:
+                i = (i + 1) & (size - 1)
+            slots[i] = (digest, path, offset)
+
+        return self._append(_u32.pack(size) + b''.join(
+            _slot.pack(*(slot or (0, 0, 0))) for slot in slots))
+
+    def write(self, value, path=''):
+        if value is None:
+            return self._append(b'N')
+        elif value is True:
+            return self._append(b'T')
+        elif value is False:
+            return self._append(b'F')
+        elif isinstance(value, (str, _text)):
+            return self.string(value)
+        elif isinstance(value, _integer_types):
+            if -2 ** 63 <= value < 2 ** 63:
+                return self._append(b'I' + _int.pack(value))
+            return self._sized(b'B', '{}'.format(value).encode('ascii'))
+        elif isinstance(value, float):
+            return self._append(b'D' + _float.pack(value))
+        elif isinstance(value, bytes):
+            return self._sized(b'X', value)
+        elif isinstance(value, datetime.datetime):
+            return self._append(b'W' + _pack_datetime(value))
+        elif isinstance(value, datetime.date):
+            return self._append(b'Y' + _date.pack(value.year, value.month,
+                                                  value.day))
+        elif isinstance(value, Mapping):
+            return self._container(value, self._mapping, path)
+        elif isinstance(value, (list, tuple, SnapshotList)):
+            return self._container(value, self._list, path)
+
+        raise ConfigurationError('Can not snapshot {}, a {} is not plain '
+                                 'data'.format(path or 'the configuration',
+                                               type(value).__name__))
+
+    def string(self, value):
+        offset = self.strings.get(value)
+        if offset is None:
+            data = _encode(value)
+            offset = self.strings[value] = self._append(
+                b'S' + _u32.pack(len(data)) + data)
+
+        return offset
+
+    def _sized(self, kind, data):
+        return self._append(kind + _u32.pack(len(data)) + data)
+
+    def _container(self, value, write, path):
+        offset = self.written.get(id(value))
+        if offset is not None:
+            return offset
+        if id(value) in self.active:
+            raise ConfigurationError('Can not snapshot a recursive value')
+
+        self.active.add(id(value))
+        offset = self.written[id(value)] = write(value, path)
+        self.active.discard(id(value))
+        self.keep.append(value)
+
+        return offset
+
+    def _mapping(self, node, path):
+        items = []
+        for key in node:
+            if not isinstance(key, (str, _text)):
+                raise ConfigurationError(
+                    'Can not snapshot {}, the key {!r} is not a string'.format(
+                        path or 'the configuration', key))
+
+            value = _plain_value(node, key)
+            if value is _skip:
+                if self.strict:
+                    raise ConfigurationError('Can not snapshot {}, objects '
+                                             'are not plain data'.format(
+                                                 _join(path, key)))
+                continue
+
+            offset = self.write(value, _join(path, key))
+            items.append((_encode(key), self.string(key), offset))
+
+        items.sort()
+        return self._append(b'M' + _u32.pack(len(items)) + b''.join(
+            _pair.pack(key, value) for name, key, value in items))
+
+    def _list(self, values, path):
+        offsets = [self.write(value, _join(path, i))
+                   for i, value in enumerate(values)]
+        return self._append(b'L' + _u32.pack(len(offsets)) + b''.join(
+            _u32.pack(offset) for offset in offsets))
+
+    def _append(self, data):
+        offset = len(self.data)
+        self.data += data
+        return offset
+
+
+def _plain_value(node, key):
+    # Read the stored value so lazy objects are not built; only refs are
+    # resolved. The nested mappings of a lazy config are wrapped first, a
+    # ref in one walks its path by attribute
+    if not isinstance(node, dict):
+        return node[key]
+
+    value = dict.__getitem__(node, key)
+    materialize = getattr(type(node), '_materialize', None)
+    if type(value) is dict and materialize is not None:
+        value = materialize(node, key)
+    elif isinstance(value, Ref):
+        return value.__get__(node, type(node))
+    elif hasattr(type(value), '__get__'):
+        return _skip
+
+    return value
+
+
+def _read(buffer, offset, index=None, prefix=None):
+    kind = buffer[offset:offset + 1].tobytes()
+    if kind == b'S':
+        return _string_bytes(buffer, offset).decode('utf-8')
+    elif kind == b'I':
+        return _int.unpack_from(buffer, offset + 1)[0]
+    elif kind == b'M':
+        return SnapshotMapping(buffer, offset, index,
+                               prefix if index is not None else None)
+    elif kind == b'L':
+        return SnapshotList(buffer, offset, index,
+                            prefix if index is not None else None)
+    elif kind == b'D':
+        return _float.unpack_from(buffer, offset + 1)[0]
+    elif kind == b'B':
+        return int(_string_bytes(buffer, offset).decode('ascii'))
+    elif kind == b'X':
+        return _string_bytes(buffer, offset)
+    elif kind == b'Y':
+        return datetime.date(*_date.unpack_from(buffer, offset + 1))
+    elif kind == b'W':
+        return _unpack_datetime(buffer, offset + 1)
+    elif kind == b'T':
+        return True
+    elif kind == b'F':
+        return False
+    elif kind == b'N':
+        return None
+
+    raise ConfigurationError('Corrupt configuration snapshot')
+
+
+class _Index(object):
+    "Reads the path index of a snapshot"
+    __slots__ = ('buffer', 'offset', 'mask')
+
+    def __init__(self, buffer, offset):
+        self.buffer = buffer
+        self.offset = offset + _u32.size
+        self.mask = _u32.unpack_from(buffer, offset)[0] - 1
+
+    def find(self, path):
+        "The offset of the value at path, None if there is none"
+        data = _encode(path)
+        digest = _hash(data)
+        i = digest & self.mask
+        while True:
+            slot_digest, path_offset, offset = _slot.unpack_from(
+                self.buffer, self.offset + i * _slot.size)
+            if not path_offset:
+                return None
+            elif (slot_digest == digest and
+                    _string_bytes(self.buffer, path_offset) == data):
+                return offset
+            i = (i + 1) & self.mask
+
+
+def _paths(buffer, offset, prefix):
+    "Yield (path, offset) for every value under the container at offset"
+    stack = [(prefix, offset)]
+    while stack:
+        prefix, offset = stack.pop()
+        kind = buffer[offset:offset + 1].tobytes()
+        if kind not in (b'M', b'L'):
+            continue
+
+        count = _u32.unpack_from(buffer, offset + 1)[0]
+        for i in range(count):
+            if kind == b'M':
+                key_offset, value_offset = _pair.unpack_from(
+                    buffer, offset + 5 + i * _pair.size)
+                key = _string_bytes(buffer, key_offset).decode('utf-8')
+                if '.' in key:
+                    continue
+            else:
+                key = '{}'.format(i)
+                value_offset = _u32.unpack_from(
+                    buffer, offset + 5 + i * _u32.size)[0]
+
+            path = prefix + key
+            yield path, value_offset
+            stack.append((path + '.', value_offset))
+
+
+def _child(prefix, key):
+    "The path prefix of the values of a container read by key"
+    if prefix is None or '.' in key:
+        return None
+
+    return prefix + key + '.'
+
+
+def _join(path, key):
+    return '{}.{}'.format(path, key) if path else '{}'.format(key)
+
+
+def _pack_datetime(value):
+    offset = value.utcoffset()
+    seconds = 0 if offset is None else int(offset.total_seconds())
+    return _datetime.pack(value.year, value.month, value.day, value.hour,
+                          value.minute, value.second, value.microsecond,
+                          seconds, offset is not None)
+
+
+def _unpack_datetime(buffer, offset):
+    fields = _datetime.unpack_from(buffer, offset)
+    value = datetime.datetime(*fields[:7])
+    if not fields[8]:
+        return value
+    if _timezone is None:
+        raise ConfigurationError('Datetimes with a timezone need python 3')
+
+    return value.replace(
+        tzinfo=_timezone(datetime.timedelta(seconds=fields[7])))
+
+
+def _hash(data):
+    return zlib.crc32(data) & 0xffffffff
+
+
+def _string_bytes(buffer, offset):
+    size = _u32.unpack_from(buffer, offset + 1)[0]
+    return buffer[offset + 5:offset + 5 + size].tobytes()
+
+
+def _encode(text):
+    return text.encode('utf-8') if isinstance(text, _text) else text
+
+
+def _shared_memory(**kwargs):
+    if shared_memory is None:
+        raise ConfigurationError('Shared memory snapshots need python 3.8+')
+
+    if not kwargs.get('create') and sys.version_info >= (3, 13):
+        # Attached processes must not unlink the block when they exit
+        kwargs['track'] = False
+
+    shm = shared_memory.SharedMemory(**kwargs)
+    if not kwargs.get('create') and sys.version_info < (3, 13):
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+
+    return shm
+
+_skip = object()
@@ -0,0 +1,152 @@
+import time
+import logging
+
+from threading import Lock
+
+from ._watch import log
+
+__all__ = ['LoadStats']
+
+# py2 has no perf_counter
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class LoadStats(object):
+    """
+    Durations and counts of the phases of loading configuration files, in
+    total and per file, and of every registered tag's constructor.
+    Pass one to Configuration(stats=...) or Configuration.aload; without
+    one nothing is timed. The phases are
+
+        read       reading a file
+        cache      looking a file up in the parse cache
+        parse      building the yaml node graph
+        raw        constructing the raw view
+        construct  constructing the view with the tags, so tags included
+        calls      building !!object/call objects on the executor
+        merge      merging a file into the configuration
+        resolve    resolving every ref with resolve='eager'
+
+    Tags are timed from their constructor, so !!object times the import
+    and !!object/call the import and the call (unless an executor builds
+    it). A tag nested in another is counted in both.
+    listener, if given, is called with (phase, name, seconds) for every
+    record, name being the file or, for the 'tag' phase, the tag; that is
+    the place to send them to a metrics sink
+    """
+    def __init__(self, listener=None):
+        self.listener = listener
+        self.phases = {}
+        self.files = {}
+        self.tags = {}
+        self.__lock = Lock()
+
+    def record(self, phase, seconds, name=None):
+        with self.__lock:
+            if phase == 'tag':
+                _add(self.tags, name, seconds)
+            else:
+                _add(self.phases, phase, seconds)
+                if name is not None:
+                    _add(self.files.setdefault(name, {}), phase, seconds)
+
+        if self.listener is not None:
+            self.listener(phase, name, seconds)
+
+    def timed(self, phase, name=None):
+        "Context manager recording the time spent in its block"
+        return _Timer(self, phase, name)
+
+    @property
+    def total(self):
+        "Seconds spent in all the phases"
+        return sum(seconds for count, seconds in self.phases.values())
+
+    def as_dict(self):
+        "Everything recorded, as plain data for json and the like"
+        def entries(stats):
+            return dict((key, {'count': count, 'seconds': seconds})
+                        for key, (count, seconds) in stats.items())
+
+        with self.__lock:
+            return {
+                'phases': entries(self.phases),
+                'files': dict((name, entries(phases))
+                              for name, phases in self.files.items()),
+                'tags': entries(self.tags),
+            }
+
+    def log(self, logger=log, level=logging.INFO):
+        "Log one line per phase, file and tag, slowest first"
+        for kind, stats in (('phase', self.phases), ('tag', self.tags)):
+            for key, (count, seconds) in _slowest(stats):
+                logger.log(level, 'load %s %s: %.6fs over %d', kind, key,
+                           seconds, count)
+
+        for name, phases in sorted(self.files.items()):
+            logger.log(level, 'load file %s: %s', name, ', '.join(
+                '{} {:.6f}s'.format(phase, seconds)
+                for phase, (count, seconds) in _slowest(phases)))
+
+    def clear(self):
+        with self.__lock:
+            self.phases = {}
+            self.files = {}
+            self.tags = {}
+
+
+class _Timer(object):
+    __slots__ = ('stats', 'phase', 'name', 'start')
+
+    def __init__(self, stats, phase, name):
+        self.stats = stats
+        self.phase = phase
+        self.name = name
+
+    def __enter__(self):
+        self.start = timer()
+
+    def __exit__(self, *exc_info):
+        self.stats.record(self.phase, timer() - self.start, self.name)
+
+
+class _Untimed(object):
+    "Stands in for a _Timer when there are no stats"
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+_untimed = _Untimed()
+
+
+def timed(stats, phase, name=None):
+    "stats.timed(phase, name), or a context manager doing nothing for None"
+    if stats is None:
+        return _untimed
+
+    return _Timer(stats, phase, name)
+
+
+def timed_constructor(tag, constructor):
+    "constructor recording its time on loader.stats under tag"
+    def timed_constructor(loader, *args):
+        start = timer()
+        try:
+            return constructor(loader, *args)
+        finally:
+            loader.stats.record('tag', timer() - start, tag)
+
+    return timed_constructor
+
+
+def _add(stats, key, seconds):
+    count, total = stats.get(key, (0, 0.0))
+    stats[key] = (count + 1, total + seconds)
+
+
+def _slowest(stats):
+    return sorted(stats.items(), key=lambda item: -item[1][1])
@@ -0,0 +1,109 @@
+
+from .tags.ref import Ref, RefPath
+from .tags.merge import Merge
+
+__all__ = []
+
+
+class PathTrie(object):
+    """
+    Items indexed by dot separated path, one trie node per path segment.
+    match(path) finds the items at path, above it and below it by walking
+    the segments of path and the subtree under it, so its cost does not
+    grow with the items stored elsewhere in the trie
+    """
+    __slots__ = ('children', 'items')
+
+    def __init__(self):
+        self.children = {}
+        self.items = {}
+
+    def add(self, path, item):
+        node = self
+        for name in path.split('.'):
+            child = node.children.get(name)
+            if child is None:
+                child = node.children[name] = PathTrie()
+            node = child
+
+        node.items[item] = node.items.get(item, 0) + 1
+
+    def discard(self, path, item):
+        nodes = [self]
+        for name in path.split('.'):
+            node = nodes[-1].children.get(name)
+            if node is None:
+                return
+            nodes.append(node)
+
+        count = nodes[-1].items.pop(item, 0) - 1
+        if count > 0:
+            nodes[-1].items[item] = count
+
+        # Prune the nodes left empty
+        names = path.split('.')
+        while len(nodes) > 1 and not (nodes[-1].items or nodes[-1].children):
+            nodes.pop()
+            del nodes[-1].children[names[len(nodes) - 1]]
+
+    def match(self, path):
+        "The items at path, at a path above it or at a path below it"
+        node = self
+        for name in path.split('.'):
+            node = node.children.get(name)
+            if node is None:
+                return
+            for item in node.items:
+                yield item
+
+        stack = list(node.children.values())
+        while stack:
+            node = stack.pop()
+            for item in node.items:
+                yield item
+            stack.extend(node.children.values())
+
+
+def ref_targets(document):
+    """
+    Yield (location, target) for every Ref in a parsed document: the path
+    of the Ref and the path it reads. Refs are resolved from the mapping
+    holding them, and a Ref used as a suffix reads a second path
+    """
+    stack = [('', document)]
+    while stack:
+        prefix, obj = stack.pop()
+        if isinstance(obj, Merge):
+            obj = obj.value
+
+        if isinstance(obj, list):
+            stack.extend(('{}{}.'.format(prefix, i), value)
+                         for i, value in enumerate(obj))
+            continue
+        elif not isinstance(obj, dict):
+            continue
+
+        for key, value in dict.items(obj):
+            location = '{}{}'.format(prefix, key)
+            if isinstance(value, Ref):
+                path = value._path
+                yield location, prefix + path.ref
+                while isinstance(path.suffix, RefPath):
+                    path = path.suffix
+                    yield location, prefix + path.ref
+            elif isinstance(value, (dict, list, Merge)):
+                stack.append((location + '.', value))
+
+
+def is_ref(raw, path):
+    "Whether the value at path in a raw document is a ref"
+    value = raw
+    for name in path.split('.'):
+        if isinstance(value, dict):
+            value = value.get(name)
+        elif isinstance(value, list) and name.isdigit():
+            value = value[int(name)] if int(name) < len(value) else None
+        else:
+            return False
+
+    return hasattr(value, 'startswith') and value.startswith('!!ref')
@@ -0,0 +1,54 @@
+
+import os
+import logging
+
+from threading import Thread, Event
+from weakref import ref
+
+__all__ = []
+
+log = logging.getLogger('configuration')
+
+
+def file_stamp(path):
+    """
+    What a file looked like when it was read: its inode, size and mtime.
+    A file replaced by a rename gets a new inode even when the mtime and
+    size do not change. None for a missing file
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    return st.st_ino, st.st_size, getattr(st, 'st_mtime_ns', st.st_mtime)
+
+
+class Watcher(Thread):
+    """
+    Daemon thread that calls Configuration.reload every interval seconds.
+    It only holds a weak reference to the Configuration, so it stops once
+    the Configuration is garbage collected
+    """
+    def __init__(self, config, interval):
+        super(Watcher, self).__init__(name='configuration-watcher')
+        self.daemon = True
+        self._config = ref(config)
+        self._interval = interval
+        self._stopped = Event()
+
+    def run(self):
+        while not self._stopped.wait(self._interval):
+            config = self._config()
+            if config is None:
+                return
+
+            try:
+                config.reload()
+            except Exception:
+                # Keep serving the last good snapshot
+                log.exception('Failed to reload the configuration')
+            del config
+
+    def stop(self):
+        self._stopped.set()
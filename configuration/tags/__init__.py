@@ -3,3 +3,4 @@ from ._base import TagRegistry
 # Import the global tags
 from .ref import *
 from ._object import *
+from .merge import *
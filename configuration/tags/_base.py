@@ -1,5 +1,10 @@
 from threading import RLock
 
+from yaml.error import Mark
+from yaml.nodes import ScalarNode, SequenceNode
+
+from .._stats import timed_constructor
+
 __all__ = ['TagRegistry']
 
 
@@ -10,17 +15,23 @@ class TagRegistry(object):
     Basically since the __* attributes are defined as a mutable class attribute
     all instances of this class share the state of __*
     To make this threadsafe we wrap the only way to add tags in an RLock
+    Every registration bumps the version, which retires the loader and
+    dumper classes built for the previous set of tags
     """
     __constructor = {}
     __representer = {}
     __multi_constructor = {}
     __multi_representer = {}
     __lock = RLock()
+    __version = 0
+    __classes = {}
+    __signatures = {}
 
     @classmethod
     def register_tag(cls, tag=None, data_type=None,
                      constructor=None, representer=None):
         with cls.__lock:
+            cls.__version += 1
             if data_type:
                 cls.__representer[data_type] = representer
 
@@ -33,6 +44,7 @@ class TagRegistry(object):
     def register_multi_tag(cls, tag=None, data_type=None,
                            constructor=None, representer=None):
         with cls.__lock:
+            cls.__version += 1
             if data_type:
                 cls.__multi_representer[data_type] = representer
 
@@ -41,17 +53,128 @@ class TagRegistry(object):
                 for tag in tags:
                     cls.__multi_constructor[tag] = constructor
 
+    @property
+    def version(self):
+        return self.__version
+
+    def loader(self, base, timed=False):
+        """
+        Subclass of the yaml Loader class base with every registered tag.
+        It is built once per set of tags, PyYAML's own classes are left
+        untouched, so loads pay nothing for the tags and loads using other
+        tags do not interfere.
+        With timed the constructors record their time on the LoadStats set
+        as the stats attribute of the loader
+        """
+        if timed:
+            return self.__subclass(base, self.__setup_timed_loader)
+
+        return self.__subclass(base, self.__setup_loader)
+
+    def dumper(self, base):
+        "Subclass of the yaml Dumper class base with every tag representer"
+        return self.__subclass(base, self.__setup_dumper)
+
+    @property
+    def signature(self):
+        """
+        Names every tag and its constructor, so data built with one set of
+        tags (in another process too) is not mistaken for data built with
+        another
+        """
+        version = self.__version
+        signature = self.__signatures.get(version)
+        if signature is None:
+            constructors = list(self.tag_constructors) + [
+                (tag + '*', constructor)
+                for tag, constructor in self.multi_tag_constructors]
+            signature = ','.join(sorted('{}={}.{}'.format(
+                tag, getattr(constructor, '__module__', None),
+                getattr(constructor, '__qualname__',
+                        getattr(constructor, '__name__', None)))
+                for tag, constructor in constructors))
+            TagRegistry.__signatures = {version: signature}
+
+        return signature
+
+    def __subclass(self, base, setup):
+        key = (base, setup.__name__, self.__version)
+        cls = self.__classes.get(key)
+        if cls is None:
+            with self.__lock:
+                key = (base, setup.__name__, self.__version)
+                cls = self.__classes.get(key)
+                if cls is None:
+                    cls = type(base.__name__, (base,), {})
+                    setup(cls)
+                    # Only the classes for the current tags are kept
+                    classes = dict((k, v) for k, v in self.__classes.items()
+                                   if k[2] == self.__version)
+                    classes[key] = cls
+                    TagRegistry.__classes = classes
+
+        return cls
+
+    def __setup_loader(self, cls):
+        for tag, constructor in self.tag_constructors:
+            cls.add_constructor(_tag(tag), constructor)
+
+        # PyYAML tries every multi tag prefix in turn on each tagged node.
+        # They all go in one table instead, looked up by _dispatch
+        prefixes = dict(cls.yaml_multi_constructors)
+        fallback = prefixes.pop(None, None)
+        for tag, constructor in self.multi_tag_constructors:
+            prefixes[_tag(tag)] = constructor
+
+        cls.multi_tag_prefixes = dict(
+            (prefix, constructor) for prefix, constructor in prefixes.items()
+            if prefix.endswith(':'))
+        cls.multi_tag_others = [
+            (prefix, constructor) for prefix, constructor in prefixes.items()
+            if not prefix.endswith(':')]
+        cls.multi_tag_fallback = fallback
+        cls.yaml_multi_constructors = {None: _dispatch}
+
+    def __setup_timed_loader(self, cls):
+        self.__setup_loader(cls)
+
+        for tag, constructor in self.tag_constructors:
+            cls.add_constructor(_tag(tag), timed_constructor(tag, constructor))
+
+        cls.multi_tag_prefixes = dict(cls.multi_tag_prefixes)
+        for tag, constructor in self.multi_tag_constructors:
+            cls.multi_tag_prefixes[_tag(tag)] = timed_constructor(
+                tag, constructor)
+
+    def __setup_dumper(self, cls):
+        for data_type, representer in self.tag_representers:
+            cls.add_representer(data_type, representer)
+
+        for data_type, representer in self.multi_tag_representers:
+            cls.add_multi_representer(data_type, representer)
+
     def setup_yaml(self, yaml):
+        """
+        Register every tag on PyYAML's global classes. Configuration does
+        not need this, it uses the classes from loader() and dumper()
+        """
         sc = yaml.constructor.SafeConstructor
         sc.add_constructor(None, _safe_unknown)
 
+        # libyaml's CLoader keeps its own constructor tables
+        c_loader = getattr(yaml, 'CLoader', None)
+
         for tag, constructor in self.tag_constructors:
             tag = ':'.join(['tag', 'yaml.org,2002', tag, ''])
             yaml.add_constructor(tag, constructor)
+            if c_loader is not None:
+                c_loader.add_constructor(tag, constructor)
 
         for tag, constructor in self.multi_tag_constructors:
             tag = ':'.join(['tag', 'yaml.org,2002', tag, ''])
             yaml.add_multi_constructor(tag, constructor)
+            if c_loader is not None:
+                c_loader.add_multi_constructor(tag, constructor)
 
         for data_type, representer in self.tag_representers:
             yaml.add_representer(data_type, representer)
@@ -84,8 +207,92 @@ class TagRegistry(object):
             yield (k, v)
 
 
+def _tag(tag):
+    return ':'.join(['tag', 'yaml.org,2002', tag, ''])
+
+
+def _dispatch(loader, tag, node):
+    """
+    Construct node with the multi tag constructor for its tag.
+    Only the prefixes of tag that end at a ':' are looked up, shortest
+    first, so this costs the same however many tags are registered. What
+    PyYAML would do without multi tags is done when none matches
+    """
+    prefixes = loader.multi_tag_prefixes
+    end = tag.find(':')
+    while end != -1:
+        constructor = prefixes.get(tag[:end + 1])
+        if constructor is not None:
+            return constructor(loader, tag[end + 1:], node)
+        end = tag.find(':', end + 1)
+
+    for prefix, constructor in loader.multi_tag_others:
+        if tag.startswith(prefix):
+            return constructor(loader, tag[len(prefix):], node)
+
+    if loader.multi_tag_fallback is not None:
+        return loader.multi_tag_fallback(loader, tag, node)
+
+    constructor = loader.yaml_constructors.get(None)
+    if constructor is not None:
+        return constructor(loader, node)
+
+    if isinstance(node, ScalarNode):
+        return loader.construct_scalar(node)
+    if isinstance(node, SequenceNode):
+        return loader.construct_sequence(node)
+    return loader.construct_mapping(node)
+
+
+# Unknown tags are met again and again (each !!ref:path in the raw view)
+_unknown = {}
+
+
 def _safe_unknown(loader, node):
-    parts = node.tag.split(':')
+    tag = _unknown.get(node.tag)
+    if tag is None:
+        if len(_unknown) > 10000:
+            _unknown.clear()
+        tag = _unknown[node.tag] = _unknown_tag(node.tag)
+
+    if isinstance(node, ScalarNode):
+        value = loader.construct_scalar(node)
+        if not value:
+            return tag
+    elif isinstance(node, SequenceNode):
+        value = loader.construct_sequence(node, deep=True)
+    else:
+        value = loader.construct_mapping(node, deep=True)
+
+    return TaggedValue(tag, value)
+
+
+class TaggedValue(str):
+    """
+    An unknown tag in the raw view: the tag as written (!!object/call:x),
+    with the value under it kept as value, so two tags are only equal when
+    their values are too
+    """
+    def __new__(cls, tag, value):
+        self = super(TaggedValue, cls).__new__(cls, tag)
+        self.value = value
+        return self
+
+    def __reduce__(self):
+        return TaggedValue, (str(self), self.value)
+
+    def __eq__(self, other):
+        return (str.__eq__(self, other) is True and
+                self.value == getattr(other, 'value', None))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = str.__hash__
+
+
+def _unknown_tag(tag):
+    parts = tag.split(':')
     prefix = ''
     if parts[0] == 'tag':
         prefix += '!!'
@@ -94,3 +301,16 @@ def _safe_unknown(loader, node):
     tag = parts[0]
     parts = parts[1:]
     return ''.join([prefix, tag, ':'] + parts)
+
+
+def start_mark(loader, node):
+    """
+    The start mark of node, named after the file being loaded.
+    libyaml names every mark "<unicode string>" when parsing a str, so the
+    file name set on the loader is used instead. The copy does not keep the
+    document buffer alive
+    """
+    mark = node.start_mark
+    name = getattr(loader, 'name', None) or mark.name
+
+    return Mark(name, mark.index, mark.line, mark.column, None, None)
@@ -1,25 +1,47 @@
 
-from yaml.constructor import (SequenceNode, MappingNode, ConstructorError)
+from threading import local, Lock
+from contextlib import contextmanager
+from collections import defaultdict
 
-from ._base import TagRegistry
+from yaml.constructor import (SequenceNode, MappingNode, ConstructorError,
+                              Constructor)
+
+try:
+    from concurrent.futures import (wait, FIRST_COMPLETED,
+                                    ProcessPoolExecutor)
+except ImportError:  # py2 without the futures backport
+    wait = FIRST_COMPLETED = ProcessPoolExecutor = None
+
+try:
+    import asyncio
+except ImportError:  # py2
+    asyncio = None
+
+from ._base import TagRegistry, start_mark
 from ..errors import ConfigurationError
 
 __all__ = []
 
+_unset = object()
+
 
 class PythonObject(object):
     _object = None
     _obj_path = None
     _args = None
     _kwargs = None
-    _instance = None
+    _instance = _unset
     _call = False
     _lazy = False
+    _mark = None
+    _lock = None
 
     def __init__(self, obj_path, loader, node):
+        # The import is left to _config_instance, so lazy objects only
+        # import their module the first time they are read
         self._obj_path = obj_path
-        self._object = self._find_python_name(loader, obj_path,
-                                              node.start_mark)
+        self._lock = Lock()
+        self._mark = start_mark(loader, node)
 
         args = []
         kwargs = {}
@@ -37,30 +59,56 @@ class PythonObject(object):
         self._args = args
         self._kwargs = kwargs
 
+    def __reduce__(self):
+        # Pickle the tag, not the imported object or the instance it made,
+        # so unpickling imports and calls again like loading the yaml does
+        return (_rebuild, (self._tag, self._obj_path,
+                           self._args, self._kwargs))
+
+    @property
+    def _tag(self):
+        if self._lazy:
+            return 'object/lazy'
+        elif self._call:
+            return 'object/call'
+
+        return 'object'
+
     def __get__(self, instance, owner):
-        if not self._instance:
-            self._instance = self._object(*self._args, **self._kwargs)
+        # Double checked so reads of a built object never take the lock,
+        # and concurrent first reads still call the target exactly once
+        value = self._instance
+        if value is _unset:
+            with self._lock:
+                value = self._instance
+                if value is _unset:
+                    value = _shared(self._target()(*self._args,
+                                                   **self._kwargs))
+                    self._instance = value
 
-        return self._instance
+        return value
 
-    def _find_python_name(self, loader, name, mark):
-        try:
-            obj = loader.find_python_name(name, mark)
-        except ConstructorError as e:
-            msg = 'Failed to import {}'.format(name)
-            raise ConfigurationError(msg, *e.args)
+    def _target(self):
+        if self._object is None:
+            self._object = find_python_name(self._obj_path, self._mark)
 
-        return obj
+        return self._object
 
     @classmethod
     def _config_instance(cls, tag, instance):
         if tag.endswith('call'):
             instance._call = True
-            instance.__get__(None, None)
+            calls = getattr(_collector, 'calls', None)
+            if calls is None:
+                instance.__get__(None, None)
+            else:
+                # Import now, call later from call_all
+                instance._target()
+                calls.append(instance)
         elif tag.endswith('lazy'):
             instance._lazy = True
         else:
-            instance._instance = instance._object
+            instance._instance = instance._target()
             for name, value in instance._kwargs.items():
                 setattr(instance._instance, name, value)
 
@@ -75,15 +123,7 @@ class PythonObject(object):
 
     @classmethod
     def represent(cls, dumper, obj):
-        tag = ['tag:yaml.org,2002:object']
-        if obj._lazy:
-            tag.append('lazy')
-        elif obj._call:
-            tag.append('call')
-
-        tag = '/'.join(tag)
-
-        tag += ':' + obj._obj_path
+        tag = ':'.join(['tag:yaml.org,2002', obj._tag, obj._obj_path])
 
         if not obj._args and not obj._kwargs:
             return dumper.represent_mapping(tag, {})
@@ -97,6 +137,188 @@ class PythonObject(object):
         else:  # obj._kwargs and not obj._args
             return dumper.represent_mapping(tag, obj._kwargs)
 
+
+def find_python_name(name, mark=None):
+    """
+    Import and return the object at the dotted path name.
+    Resolved names are cached for the whole process, so every Configuration
+    that uses the same object pays for the lookup once
+    """
+    try:
+        return _python_names[name]
+    except KeyError:
+        pass
+
+    try:
+        obj = _constructor.find_python_name(name, mark)
+    except ConstructorError as e:
+        msg = 'Failed to import {}'.format(name)
+        raise ConfigurationError(msg, *e.args)
+
+    _python_names[name] = obj
+    return obj
+
+_python_names = {}
+_constructor = Constructor()
+
+
+@contextmanager
+def collect_calls():
+    """
+    Collect the !!object/call objects constructed in this thread, instead of
+    calling them, so call_all can build them concurrently
+    """
+    calls = []
+    previous = getattr(_collector, 'calls', None)
+    _collector.calls = calls
+    try:
+        yield calls
+    finally:
+        _collector.calls = previous
+
+_collector = local()
+
+
+def call_all(calls, executor):
+    """
+    Build the collected !!object/call objects on a concurrent.futures
+    executor. An object is only submitted once the collected objects in its
+    arguments are built, so independent objects are built concurrently and
+    the wall time is bounded by the slowest chain of constructors. Every
+    failure is collected and raised in one ConfigurationError.
+    The executor has to run in this process, see check_executor
+    """
+    pending = set(calls)
+    waiting_on = dict((obj, dependencies(obj, pending)) for obj in calls)
+    dependents = defaultdict(list)
+    for obj, deps in waiting_on.items():
+        for dependency in deps:
+            dependents[dependency].append(obj)
+
+    running = {}
+
+    def submit(obj):
+        future = executor.submit(obj._target(), *obj._args, **obj._kwargs)
+        running[future] = obj
+
+    for obj in calls:
+        if not waiting_on[obj]:
+            submit(obj)
+
+    errors = []
+    while running:
+        done = wait(list(running), return_when=FIRST_COMPLETED)[0]
+        for future in done:
+            obj = running.pop(future)
+            try:
+                obj._instance = _shared(future.result())
+            except Exception as e:
+                errors.append((obj, e))
+                continue
+
+            pending.discard(obj)
+            for dependent in dependents[obj]:
+                waiting_on[dependent].discard(obj)
+                if not waiting_on[dependent]:
+                    submit(dependent)
+
+    if errors:
+        failed = set(obj for obj, e in errors)
+        skipped = [obj for obj in calls
+                   if obj in pending and obj not in failed]
+        raise call_error(errors, skipped)
+
+
+def check_executor(executor):
+    """
+    Raise ConfigurationError for a process pool: its calls get pickled
+    copies of the built objects in their arguments, and unpickling builds
+    those again
+    """
+    if ProcessPoolExecutor is not None and isinstance(executor,
+                                                      ProcessPoolExecutor):
+        raise ConfigurationError('executor must be a thread pool, the '
+                                 'arguments of a process pool call would '
+                                 'be built again')
+
+
+def call_error(errors, skipped):
+    """
+    ConfigurationError for the (object, exception) pairs in errors and the
+    objects skipped because one of their arguments failed
+    """
+    msgs = ['{} ({}): {!r}'.format(obj._obj_path, _where(obj), e)
+            for obj, e in errors]
+    msgs.extend('{} ({}): not called, an argument failed'.format(
+        obj._obj_path, _where(obj)) for obj in skipped)
+    msg = 'Failed to call objects:\n  {}'.format('\n  '.join(msgs))
+
+    return ConfigurationError(msg, *[e for obj, e in errors])
+
+
+def dependencies(obj, calls):
+    "The objects in calls found in the arguments of obj"
+    found = set()
+    seen = set()
+    stack = [obj._args, obj._kwargs]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+
+        if isinstance(value, PythonObject):
+            if value in calls:
+                found.add(value)
+            else:
+                stack.extend([value._args, value._kwargs])
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+
+    return found
+
+
+def _where(obj):
+    return '{}'.format(obj._mark).strip() if obj._mark else 'unknown'
+
+
+class SharedAwaitable(object):
+    """
+    Stands in for the coroutine returned by an async !!object target, so
+    the coroutine runs once however many times, and from however many
+    tasks, the value is awaited
+    """
+    def __init__(self, coro):
+        self._coro = coro
+        self._future = None
+        self._lock = Lock()
+
+    def __await__(self):
+        with self._lock:
+            if self._future is None:
+                self._future = asyncio.ensure_future(self._coro)
+
+        return self._future.__await__()
+
+
+def _shared(value):
+    if asyncio is not None and asyncio.iscoroutine(value):
+        return SharedAwaitable(value)
+
+    return value
+
+
+def _rebuild(tag, obj_path, args, kwargs):
+    instance = PythonObject.__new__(PythonObject)
+    instance._obj_path = obj_path
+    instance._lock = Lock()
+    instance._args = args
+    instance._kwargs = kwargs
+
+    return PythonObject._config_instance(tag, instance)
+
 TagRegistry.register_multi_tag('object,object/call,object/lazy', PythonObject,
                                PythonObject.construct,
                                PythonObject.represent)
@@ -0,0 +1,45 @@
+from yaml.constructor import MappingNode, SequenceNode
+
+from ._base import TagRegistry, start_mark
+from ..errors import ConfigurationError
+
+__all__ = []
+
+STRATEGIES = ('replace', 'deep', 'append', 'unique')
+
+
+class Merge(object):
+    """
+    A value tagged with the strategy used to merge it over the value loaded
+    from the previous files, e.g. !!merge:deep on a mapping or
+    !!merge:append on a list. It is unwrapped when it is merged
+    """
+    def __init__(self, strategy, value):
+        self.strategy = strategy
+        self.value = value
+
+    @classmethod
+    def construct(cls, loader, suffix, node):
+        if suffix not in STRATEGIES:
+            msg = 'Unknown merge strategy {!r}, expected one of {} ({})'
+            raise ConfigurationError(msg.format(
+                suffix, ', '.join(STRATEGIES),
+                '{}'.format(start_mark(loader, node)).strip()))
+
+        if isinstance(node, MappingNode):
+            value = loader.construct_mapping(node, deep=True)
+        elif isinstance(node, SequenceNode):
+            value = loader.construct_sequence(node, deep=True)
+        else:
+            value = loader.construct_scalar(node)
+
+        return cls(suffix, value)
+
+    @classmethod
+    def represent(cls, dumper, merge):
+        node = dumper.represent_data(merge.value)
+        node.tag = 'tag:yaml.org,2002:merge:' + merge.strategy
+        return node
+
+TagRegistry.register_multi_tag('merge', Merge, Merge.construct,
+                               Merge.represent)
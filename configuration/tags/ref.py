@@ -1,53 +1,178 @@
-from ._base import TagRegistry
+from weakref import WeakSet, WeakValueDictionary
+
+from ._base import TagRegistry, start_mark
 from ..errors import ConfigurationError
 
 __all__ = []
 
 
 class Ref(object):
+    """
+    The resolved value is cached per Ref. While resolving, the Ref registers
+    itself with every config node on its path (and with any Ref it reads
+    through), so setting or deleting one of those keys invalidates exactly
+    the Refs that depend on it.
+    The cache is one (base, value) tuple, replaced in a single assignment,
+    so threads reading the same Ref never see a value for another base.
+    Lists have no watchers, so a Ref whose path indexes a mutable list, or
+    reads through a Ref that does, is resolved on every read instead.
+    Every invalidation bumps the generation; a value resolved while one
+    happened is not kept, it may have been read before the change.
+    """
+    _cache = (None, None)
+    _generation = 0
+    _dependents = None
+    _mark = None
+
     def __init__(self, ref):
-        self.suffix = ''
-        self.ref = ref
-        if ':' in ref:
-            parts = ref.split(':')
-            if len(parts) == 2:
-                self.ref, self.suffix = parts
-            else:
-                self.ref = parts[0]
-                self.suffix = Ref(':'.join(parts[2:]))
+        if not isinstance(ref, RefPath):
+            ref = RefPath.compile(ref)
+
+        self._path = ref
+        self.ref = ref.ref
+        self.suffix = ref.suffix
+        if isinstance(ref.suffix, RefPath):
+            self.suffix = Ref(ref.suffix)
+
+    def __getstate__(self):
+        return {'source': self._path.source, 'mark': self._mark}
+
+    def __setstate__(self, state):
+        self.__init__(state['source'])
+        self._set_mark(state['mark'])
+
+    def _set_mark(self, mark):
+        self._mark = mark
+        if isinstance(self.suffix, Ref):
+            self.suffix._set_mark(mark)
 
     @classmethod
     def construct(cls, loader, suffix, node):
-        return cls(suffix)
+        ref = cls(suffix)
+        ref._set_mark(start_mark(loader, node))
+
+        return ref
 
     @classmethod
     def represent(cls, dumper, ref):
-        if isinstance(ref.suffix, Ref):
-            ref.suffix = '{}'.format(cls.represent(dumper, ref.suffix))
-
-        return dumper.represent_scalar('tag:yaml.org,2002:ref:',
-                                       ''.join([ref.ref, ':', ref.suffix]))
+        return dumper.represent_scalar(
+            'tag:yaml.org,2002:ref:' + ref._path.source, '')
 
     # Python Descriptor syntax
     def __get__(self, instance, owner):
+        base, value = self._cache
+        if instance is not None and base is instance:
+            return value
+
+        generation = self._generation
+        value, cacheable = self._resolve(instance, owner)
+        if cacheable:
+            self._cache = (instance, value)
+            if self._generation != generation:
+                # A change raced the resolve, its invalidation came too early
+                self._cache = (None, None)
+
+        return value
+
+    @property
+    def _base(self):
+        return self._cache[0]
+
+    @property
+    def _value(self):
+        return self._cache[1]
+
+    def _resolve(self, instance, owner):
+        "The value and whether it can be cached"
         base = instance
-        parts = self.ref.split(".")
-        parts.reverse()
-        while parts:
-            s = parts.pop()
-            try:
-                instance = getattr(instance, s)
-            except AttributeError:
-                msg = 'Unable to find {}'.format(self.ref)
-                raise ConfigurationError(msg)
+        cacheable = True
+        for name, index in self._path.keys:
+            instance, watched = self._step(instance, name, index)
+            cacheable = cacheable and watched
 
         if isinstance(instance, str):
             suffix = self.suffix
             if isinstance(self.suffix, Ref):
+                self.suffix._depend(self)
                 suffix = self.suffix.__get__(base, owner)
+                cacheable = cacheable and self.suffix._base is base
 
             instance += '{}'.format(suffix)
 
-        return instance
+        return instance, cacheable
+
+    def _step(self, instance, name, index):
+        "The value of name in instance and whether a change to it is seen"
+        if index is not None and isinstance(instance, (list, tuple)):
+            try:
+                return instance[index], not isinstance(instance, list)
+            except IndexError:
+                msg = 'Unable to find {}'.format(self.ref)
+                raise ConfigurationError(msg)
+
+        stored = None
+        watch = getattr(type(instance), '_watch', None)
+        if watch is not None:
+            stored = watch(instance, name, self)
+            if isinstance(stored, Ref):
+                stored._depend(self)
+
+        try:
+            value = getattr(instance, name)
+        except AttributeError:
+            msg = 'Unable to find {}'.format(self.ref)
+            raise ConfigurationError(msg)
+
+        # A Ref read through is only seen to change if it is cached itself
+        return value, not isinstance(stored, Ref) or stored._base is instance
+
+    def _depend(self, ref):
+        if self._dependents is None:
+            self._dependents = WeakSet()
+
+        self._dependents.add(ref)
+
+    def _invalidate(self):
+        self._generation += 1
+        if self._base is None:
+            return
+
+        self._cache = (None, None)
+        dependents, self._dependents = self._dependents, None
+        for ref in list(dependents or ()):
+            ref._invalidate()
+
+
+class RefPath(object):
+    """
+    A ref string parsed once: the keys to walk (digits also index lists,
+    e.g. servers.0.host) and the suffix, itself a RefPath for chained refs.
+    Paths are interned, so every Ref to the same string shares one RefPath
+    """
+    __slots__ = ('source', 'ref', 'keys', 'suffix', '__weakref__')
+    _interned = WeakValueDictionary()
+
+    def __init__(self, source):
+        self.source = source
+        self.ref = source
+        self.suffix = ''
+        if ':' in source:
+            parts = source.split(':')
+            if len(parts) == 2:
+                self.ref, self.suffix = parts
+            else:
+                self.ref = parts[0]
+                self.suffix = RefPath.compile(':'.join(parts[2:]))
+
+        self.keys = tuple((name, int(name) if name.isdigit() else None)
+                          for name in self.ref.split('.'))
+
+    @classmethod
+    def compile(cls, source):
+        path = cls._interned.get(source)
+        if path is None:
+            path = cls._interned[source] = cls(source)
+
+        return path
 
 TagRegistry.register_multi_tag('ref', Ref, Ref.construct, Ref.represent)
@@ -0,0 +1,121 @@
+import time
+import pytest
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from configuration import Configuration, ConfigurationError
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(8) as pool:
+        yield pool
+
+
+@pytest.fixture
+def cfg_file(tmpdir):
+    cfg_file = tmpdir.join('calls.yaml')
+    cfg_file.write("""
+slow1: !!object/call:test_object_call_executor.Slow
+    name: slow1
+slow2: !!object/call:test_object_call_executor.Slow
+    name: slow2
+slow3: !!object/call:test_object_call_executor.Slow
+    name: slow3
+outer: !!object/call:test_object_call_executor.Outer
+    inner: !!object/call:test_object_call_executor.Slow
+        name: inner
+lazy: !!object/lazy:test_object_call_executor.Slow
+    name: lazy
+""")
+    return str(cfg_file)
+
+
+@pytest.fixture
+def bad_cfg_file(tmpdir):
+    cfg_file = tmpdir.join('bad_calls.yaml')
+    cfg_file.write("""
+ok: !!object/call:test_object_call_executor.Slow
+    name: ok
+bad: !!object/call:test_object_call_executor.fail
+outer: !!object/call:test_object_call_executor.Outer
+    inner: !!object/call:test_object_call_executor.fail
+""")
+    return str(cfg_file)
+
+
+def test_executor_builds_calls_concurrently(cfg_file, executor):
+    start = time.time()
+    config = Configuration(cfg_file, executor=executor)
+    elapsed = time.time() - start
+
+    assert [config.slow1.name, config.slow2.name, config.slow3.name] == [
+        'slow1', 'slow2', 'slow3']
+    assert len(set([config.slow1.thread, config.slow2.thread,
+                    config.slow3.thread])) > 1
+    # 5 slow calls, but the longest chain is 2 deep
+    assert elapsed < 4 * Slow.delay
+
+
+def test_executor_builds_arguments_first(cfg_file, executor):
+    config = Configuration(cfg_file, executor=executor)
+
+    assert config.outer.inner_name == 'inner'
+
+
+def test_executor_leaves_lazy_objects_alone(cfg_file, executor):
+    del Slow.built[:]
+    config = Configuration(cfg_file, executor=executor)
+
+    assert 'lazy' not in [obj.name for obj in Slow.built]
+    assert config.lazy.name == 'lazy'
+
+
+def test_executor_aggregates_errors(bad_cfg_file, executor):
+    with pytest.raises(ConfigurationError) as e:
+        Configuration(bad_cfg_file, executor=executor)
+
+    msg = e.value.args[0]
+    assert msg.count('test_object_call_executor.fail') == 2
+    assert 'test_object_call_executor.Outer' in msg
+    assert 'not called' in msg
+    assert all(isinstance(error, RuntimeError) for error in e.value.args[1:])
+
+
+def test_executor_must_be_a_thread_pool(cfg_file):
+    with ProcessPoolExecutor(1) as pool:
+        with pytest.raises(ConfigurationError) as e:
+            Configuration(cfg_file, executor=pool)
+
+    assert 'thread pool' in e.value.args[0]
+
+
+def test_executor_works_with_cache(cfg_file, executor, tmpdir):
+    cache = str(tmpdir.join('cache'))
+    Configuration(cfg_file, cache=cache)
+    config = Configuration(cfg_file, executor=executor, cache=cache)
+
+    assert config.outer.inner_name == 'inner'
+
+
+# classes used for testing
+class Slow(object):
+    delay = 0.2
+    built = []
+
+    def __init__(self, name):
+        time.sleep(self.delay)
+        self.name = name
+        self.thread = threading.current_thread().name
+        Slow.built.append(self)
+
+
+class Outer(object):
+    def __init__(self, inner):
+        # inner is the PythonObject, already built when Outer is called
+        self.inner_name = inner._instance.name
+
+
+def fail():
+    raise RuntimeError('failed')
@@ -0,0 +1,89 @@
+import time
+import asyncio
+import pytest
+import threading
+
+from configuration import Configuration
+from configuration.tags._object import SharedAwaitable
+
+
+@pytest.fixture
+def cfg_file(tmpdir):
+    cfg_file = tmpdir.join('lazy.yaml')
+    cfg_file.write("""
+lazy: !!object/lazy:test_object_lazy_concurrency.slow_factory
+falsy: !!object/lazy:test_object_lazy_concurrency.falsy_factory
+async_lazy: !!object/lazy:test_object_lazy_concurrency.async_factory
+""")
+    return str(cfg_file)
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    del CALLS[:]
+
+
+def test_object_lazy_is_built_once_by_concurrent_readers(cfg_file):
+    config = Configuration(cfg_file)
+    barrier = threading.Barrier(16)
+    results = []
+
+    def read():
+        barrier.wait()
+        results.append(config.lazy)
+
+    threads = [threading.Thread(target=read) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert CALLS == ['slow']
+    assert len(set(id(result) for result in results)) == 1
+
+
+def test_object_lazy_falsy_result_is_not_rebuilt(cfg_file):
+    config = Configuration(cfg_file)
+
+    assert config.falsy == []
+    assert config.falsy is config.falsy
+    assert CALLS == ['falsy']
+
+
+def test_object_lazy_async_factory_runs_once(cfg_file):
+    config = Configuration(cfg_file)
+
+    async def main():
+        return await asyncio.gather(*[_await(config.async_lazy)
+                                      for i in range(10)])
+
+    results = asyncio.run(main())
+
+    assert isinstance(config.async_lazy, SharedAwaitable)
+    assert CALLS == ['async']
+    assert len(set(id(result) for result in results)) == 1
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+# functions used for testing
+CALLS = []
+
+
+def slow_factory():
+    CALLS.append('slow')
+    time.sleep(0.05)
+    return object()
+
+
+def falsy_factory():
+    CALLS.append('falsy')
+    return []
+
+
+async def async_factory():
+    CALLS.append('async')
+    await asyncio.sleep(0.01)
+    return object()
@@ -4,6 +4,7 @@ import pytest
 import tempfile
 
 from configuration import Configuration, ConfigurationError
+from configuration.tags import _object
 
 
 @pytest.fixture(scope='session')
@@ -149,6 +150,57 @@ def test_object_lazy_does_not_call_more_then_once(cfg_file):
     assert config.python_lazy1 == 'Test Bassed'
 
 
+@pytest.fixture
+def lazy_module_cfg_file(tmpdir, monkeypatch):
+    tmpdir.join('lazy_import_target.py').write('def factory():\n'
+                                               '    return "imported"\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    monkeypatch.delitem(sys.modules, 'lazy_import_target', raising=False)
+
+    cfg_file = tmpdir.join('lazy.yaml')
+    cfg_file.write('lazy: !!object/lazy:lazy_import_target.factory\n'
+                   'bad_lazy: !!object/lazy:bad.item\n')
+    yield str(cfg_file)
+
+    sys.modules.pop('lazy_import_target', None)
+    _object._python_names.pop('lazy_import_target.factory', None)
+
+
+def test_object_lazy_defers_import(lazy_module_cfg_file):
+    config = Configuration(lazy_module_cfg_file)
+
+    assert 'lazy_import_target' not in sys.modules
+    assert config.lazy == 'imported'
+    assert 'lazy_import_target' in sys.modules
+
+
+def test_object_lazy_raises_ConfigurationError_on_read(lazy_module_cfg_file):
+    config = Configuration(lazy_module_cfg_file)
+
+    with pytest.raises(ConfigurationError) as e:
+        config.bad_lazy
+
+    assert '{}'.format(e.value.args[0]) == 'Failed to import bad.item'
+
+
+def test_object_names_are_resolved_once_per_process(cfg_file, monkeypatch):
+    Configuration(cfg_file)
+    lookups = []
+    find = _object._constructor.find_python_name
+
+    def counting_find(name, mark):
+        lookups.append(name)
+        return find(name, mark)
+
+    monkeypatch.setattr(_object._constructor, 'find_python_name',
+                        counting_find)
+    config = Configuration(cfg_file)
+
+    assert config.python_object1 is sys.stdout
+    assert isinstance(config.python_instance1, MyTest2)
+    assert lookups == []
+
+
 # classes used for testing
 X = 10
 
@@ -1,8 +1,13 @@
 import os
+import pickle
 import pytest
 import tempfile
+import threading
 
-from configuration import Configuration, ConfigurationError
+import yaml
+
+from configuration import Configuration, ConfigurationError, TagRegistry
+from configuration.tags.ref import Ref, RefPath
 
 
 @pytest.fixture(scope='session')
@@ -72,3 +77,195 @@ def test_ref_tag_value_keeps_up_with_config_changes(cfg_file):
 
     assert config.ref_value == new_expected
     assert config.ref_value != expected
+
+
+def test_ref_tag_value_is_cached(cfg_file):
+    config = Configuration(cfg_file)
+    ref = dict.__getitem__(config._Configuration__parsed, 'ref_value')
+
+    assert config.ref_value == 'worked'
+    ref.ref = 'some.missing.path'
+
+    assert config.ref_value == 'worked'
+
+
+def test_ref_tag_cache_survives_unrelated_changes(cfg_file):
+    config = Configuration(cfg_file)
+    ref = dict.__getitem__(config._Configuration__parsed, 'ref_value')
+
+    assert config.ref_value == 'worked'
+    config.some.dot.separated.path.to.a.other_value = 'unrelated'
+    config.unrelated = 'unrelated'
+
+    assert ref._base is not None
+
+
+def test_ref_tag_keeps_up_with_replaced_parent(cfg_file):
+    config = Configuration(cfg_file)
+
+    assert config.ref_value == 'worked'
+    config.some.dot.separated = {'path': {'to': {'a': {'value': 'new'}}}}
+
+    assert config.ref_value == 'new'
+
+
+def test_ref_tag_keeps_up_with_deleted_value(cfg_file):
+    config = Configuration(cfg_file)
+
+    assert config.ref_value == 'worked'
+    del config.some.dot.separated.path.to.a.value
+
+    with pytest.raises(ConfigurationError):
+        config.ref_value
+
+
+def test_ref_tag_suffix_ref_keeps_up_with_config_changes(cfg_file):
+    config = Configuration(cfg_file)
+
+    assert config.suffix_ref_value == 'workedworked'
+    config.some.dot.separated.path.to.a.value = 'new'
+
+    assert config.suffix_ref_value == 'newnew'
+
+
+def test_ref_tag_cache_is_not_left_stale_by_a_racing_change(cfg_file,
+                                                            monkeypatch):
+    config = Configuration(cfg_file)
+    resolved, changed = threading.Event(), threading.Event()
+    step = Ref._step
+
+    def slow_step(self, instance, name, index):
+        value = step(self, instance, name, index)
+        if name == 'value' and not resolved.is_set():
+            # The value is read, let the change happen before it is cached
+            resolved.set()
+            changed.wait(5)
+        return value
+
+    monkeypatch.setattr(Ref, '_step', slow_step)
+    results = []
+    reader = threading.Thread(target=lambda: results.append(config.ref_value))
+    reader.start()
+    assert resolved.wait(5)
+    config.some.dot.separated.path.to.a.value = 'new'
+    changed.set()
+    reader.join()
+
+    assert results == ['worked']
+    assert config.ref_value == 'new'
+
+
+def test_ref_to_ref_keeps_up_with_config_changes(cfg_file, tmpdir):
+    override = tmpdir.join('override.yaml')
+    override.write('ref_to_ref: !!ref:ref_value\n')
+    config = Configuration(cfg_file, str(override))
+
+    assert config.ref_to_ref == 'worked'
+    config.some.dot.separated.path.to.a.value = 'new'
+
+    assert config.ref_to_ref == 'new'
+
+
+def test_ref_tag_keeps_up_with_later_load(cfg_file, tmpdir):
+    override = tmpdir.join('override.yaml')
+    override.write('some:\n  dot:\n    separated:\n      path:\n'
+                   '        to:\n          a:\n            value: loaded\n')
+    config = Configuration(cfg_file)
+
+    assert config.ref_value == 'worked'
+    config.load(str(override))
+
+    assert config.ref_value == 'loaded'
+
+
+@pytest.fixture
+def list_cfg_file(tmpdir):
+    cfg_file = tmpdir.join('servers.yaml')
+    cfg_file.write("""
+first_host: !!ref:servers.0.host
+second_port: !!ref:servers.1.port
+missing_host: !!ref:servers.5.host
+servers:
+  - host: alpha
+    port: 1
+  - host: beta
+    port: 2
+""")
+    return str(cfg_file)
+
+
+def test_ref_tag_indexes_lists(list_cfg_file):
+    config = Configuration(list_cfg_file)
+
+    assert config.first_host == 'alpha'
+    assert config.second_port == 2
+
+
+def test_ref_tag_raises_ConfigurationError_for_bad_index(list_cfg_file):
+    config = Configuration(list_cfg_file)
+
+    with pytest.raises(ConfigurationError):
+        config.missing_host
+
+
+def test_ref_tag_index_keeps_up_with_config_changes(list_cfg_file):
+    config = Configuration(list_cfg_file)
+
+    assert config.first_host == 'alpha'
+    config.servers[0].host = 'gamma'
+
+    assert config.first_host == 'gamma'
+
+
+def test_ref_tag_index_keeps_up_with_list_changes(list_cfg_file, tmpdir):
+    override = tmpdir.join('override.yaml')
+    override.write('via_ref: !!ref:first_host\n'
+                   'some_server:\n  host: gamma\n')
+    config = Configuration(list_cfg_file, str(override))
+
+    assert config.first_host == 'alpha'
+    assert config.via_ref == 'alpha'
+    config.servers[0] = config.servers[1]
+    assert config.first_host == 'beta'
+    assert config.via_ref == 'beta'
+
+    config.servers.pop(0)
+    config.servers.pop(0)
+    config.servers.append(config.some_server)
+    assert config.first_host == 'gamma'
+    assert config.via_ref == 'gamma'
+
+
+def test_ref_tag_index_into_frozen_lists_is_cached(list_cfg_file):
+    config = Configuration(list_cfg_file, frozen=True)
+
+    assert config.first_host == 'alpha'
+    assert dict.__getitem__(config._root(), 'first_host')._base is not None
+
+
+def test_ref_paths_are_compiled_once_and_shared():
+    first = Ref('some.path.0:!!ref:other.path')
+    second = Ref('some.path.0:!!ref:other.path')
+
+    assert first is not second
+    assert first._path is second._path
+    assert first._path.keys == (('some', None), ('path', None), ('0', 0))
+    assert first.suffix._path is RefPath.compile('other.path')
+
+
+def test_ref_tag_round_trips_through_dump(cfg_file):
+    config = Configuration(cfg_file)
+    loader = TagRegistry().loader(yaml.Loader)
+    dumped = yaml.load(str(config), Loader=loader)
+
+    for key in ('ref_value', 're_value_with_suffix', 'suffix_ref_value'):
+        ref = dict.__getitem__(config._Configuration__parsed, key)
+        assert dumped[key]._path is ref._path
+
+
+def test_ref_tag_pickles_its_path():
+    ref = Ref('some.path:!!ref:other.path')
+    clone = pickle.loads(pickle.dumps(ref))
+
+    assert clone._path is ref._path
+    assert clone.suffix._path is ref.suffix._path
@@ -0,0 +1,110 @@
+import pytest
+import yaml
+
+from configuration import Configuration
+from configuration.tags import TagRegistry
+from configuration._cache import ConfigCache
+
+
+@pytest.fixture
+def tags():
+    tags = TagRegistry()
+    default_constructors = dict(tags.tag_constructors)
+    default_multi_constructors = dict(tags.multi_tag_constructors)
+    yield tags
+    TagRegistry._TagRegistry__constructor = default_constructors
+    TagRegistry._TagRegistry__multi_constructor = default_multi_constructors
+    TagRegistry._TagRegistry__version += 1
+
+
+@pytest.fixture
+def cfg_file(tmpdir):
+    cfg_file = tmpdir.join('tags.yaml')
+    cfg_file.write('value: worked\nref_value: !!ref:value\n')
+    return str(cfg_file)
+
+
+def test_loader_is_built_once_per_tag_set(tags):
+    loader = tags.loader(yaml.Loader)
+
+    assert tags.loader(yaml.Loader) is loader
+    assert issubclass(loader, yaml.Loader)
+    assert loader is not yaml.Loader
+    assert tags.loader(yaml.SafeLoader) is not loader
+
+
+def test_registering_a_tag_builds_a_new_loader(tags, cfg_file):
+    loader = tags.loader(yaml.Loader)
+    version = tags.version
+    signature = tags.signature
+
+    def upper(loader, node):
+        return loader.construct_scalar(node).upper()
+
+    tags.register_tag(tag='upper', constructor=upper)
+
+    assert tags.version > version
+    assert tags.signature != signature
+    assert tags.loader(yaml.Loader) is not loader
+    loader = tags.loader(yaml.Loader)
+    assert yaml.load('value: !!upper: worked', Loader=loader) == {
+        'value': 'WORKED'}
+
+
+def test_configuration_leaves_pyyaml_untouched(cfg_file):
+    constructors = dict(yaml.Loader.yaml_constructors)
+    multi_constructors = dict(yaml.Loader.yaml_multi_constructors)
+    safe_constructors = dict(yaml.SafeLoader.yaml_constructors)
+    representers = dict(yaml.Dumper.yaml_representers)
+
+    config = Configuration(cfg_file)
+
+    assert config.ref_value == 'worked'
+    assert '!!ref:value' in str(config)
+    assert yaml.Loader.yaml_constructors == constructors
+    assert yaml.Loader.yaml_multi_constructors == multi_constructors
+    assert yaml.SafeLoader.yaml_constructors == safe_constructors
+    assert yaml.Dumper.yaml_representers == representers
+
+
+def test_cache_key_includes_the_tags(tags, tmpdir):
+    cache = ConfigCache(str(tmpdir))
+
+    assert cache.key('a: 1', tags.signature) == cache.key('a: 1',
+                                                          tags.signature)
+    assert cache.key('a: 1', tags.signature) != cache.key('a: 1')
+
+
+def test_multi_tags_share_one_dispatch_table(tags):
+    loader = tags.loader(yaml.Loader)
+
+    assert list(loader.yaml_multi_constructors) == [None]
+    assert 'tag:yaml.org,2002:ref:' in loader.multi_tag_prefixes
+    assert 'tag:yaml.org,2002:python/name:' in loader.multi_tag_prefixes
+
+
+def test_dispatch_matches_pyyaml():
+    loader = TagRegistry().loader(yaml.Loader)
+
+    data = yaml.load('name: !!python/name:os.path.join\n'
+                     'plain: !!str 1\n'
+                     'merged: !!merge:deep {a: 1}\n', Loader=loader)
+    assert data['name'] is __import__('os').path.join
+    assert data['plain'] == '1'
+    assert data['merged'].strategy == 'deep'
+    with pytest.raises(yaml.constructor.ConstructorError):
+        yaml.load('value: !!unknown:tag 1', Loader=loader)
+    with pytest.raises(yaml.constructor.ConstructorError):
+        yaml.load('value: !custom 1', Loader=loader)
+
+
+def test_dispatch_with_many_tags(tags):
+    def constructor(name):
+        return lambda loader, suffix, node: (name, suffix)
+
+    for i in range(50):
+        tags.register_multi_tag('tag{}'.format(i), constructor=constructor(i))
+
+    loader = tags.loader(yaml.Loader)
+    data = yaml.load('a: !!tag7:x:y\nb: !!tag49:\n', Loader=loader)
+    assert data == {'a': (7, 'x:y'), 'b': (49, '')}
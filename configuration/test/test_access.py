@@ -0,0 +1,157 @@
+import pickle
+import pytest
+
+from configuration import Configuration, AccessStats, Snapshot
+from configuration._base import _YAMLObj
+
+
+@pytest.fixture
+def cfg_file(tmpdir):
+    cfg_file = tmpdir.join('access.yaml')
+    cfg_file.write("""
+name: service
+url: !!ref:database.host
+database:
+    host: localhost
+    port: 5432
+    options:
+        timeout: 10
+servers:
+    - host: alpha
+    - host: beta
+unused:
+    deep:
+        value: 1
+""")
+    return str(cfg_file)
+
+
+@pytest.mark.parametrize('options', [{}, {'lazy': True}, {'frozen': True},
+                                     {'resolve': 'eager'}])
+def test_access_counts_reads(cfg_file, options):
+    access = AccessStats()
+    config = Configuration(cfg_file, access=access, **options)
+
+    for _ in range(3):
+        assert config.name == 'service'
+    assert config.database['port'] == 5432
+    assert config.servers[1].host == 'beta'
+
+    counts = access.counts()
+    assert counts['name'] == 3
+    assert counts['database'] == 1
+    assert counts['database.port'] == 1
+    assert counts['servers.1.host'] == 1
+    assert access.hottest(1) == [('name', 3)]
+    assert 'unused' in access.never_read()
+    assert 'database.options' in access.never_read()
+    assert 'unused.deep' not in access.never_read()
+
+
+@pytest.mark.parametrize('options', [{}, {'lazy': True}, {'frozen': True}])
+@pytest.mark.parametrize('read', [
+    lambda database: database.get('host'),
+    lambda database: database.items(),
+    lambda database: database.values(),
+    lambda database: dict(database),
+    lambda database: dict(**database),
+    lambda database: 'host' in database,
+])
+def test_access_counts_mapping_reads(cfg_file, options, read):
+    access = AccessStats()
+    config = Configuration(cfg_file, access=access, **options)
+    read(config.database)
+
+    assert 'database.host' not in access.never_read()
+    assert access.counts()['database.host'] == 1
+
+
+def test_access_ignores_dumps_and_snapshots(cfg_file):
+    access = AccessStats()
+    config = Configuration(cfg_file, access=access)
+    str(config)
+    Snapshot.dumps(config)
+
+    # only the ref in url is followed
+    assert sorted(access.counts()) == ['database', 'database.host']
+    assert 'name' in access.never_read()
+    assert 'database.port' in access.never_read()
+
+
+def test_access_follows_refs(cfg_file):
+    access = AccessStats()
+    config = Configuration(cfg_file, access=access)
+
+    assert config.url == 'localhost'
+    assert access.counts()['database.host'] == 1
+    assert 'database.host' not in access.never_read()
+    assert 'database.port' in access.never_read()
+
+
+@pytest.mark.parametrize('options', [{}, {'lazy': True}, {'frozen': True},
+                                     {'resolve': 'eager'}])
+def test_access_counts_carry_over_reloads(cfg_file, options):
+    access = AccessStats()
+    config = Configuration(cfg_file, access=access, **options)
+    assert config.database.host == 'localhost'
+    assert config.servers[0].host == 'alpha'
+
+    with open(cfg_file, 'a') as f:
+        f.write('extra: 1\n')
+    config.reload()
+    assert config.database.host == 'localhost'
+    assert config.evolve({'database.port': 1}).database.port == 1
+
+    counts = access.counts()
+    assert counts['database.host'] == 2
+    assert counts['database.port'] == 1
+    assert counts['servers.0.host'] == 1
+    assert 'extra' in access.never_read()
+    assert 'servers.1.host' in access.never_read()
+    # only paths are kept, not the nodes
+    assert all(isinstance(path, str) for path in access._seen)
+
+
+def test_access_sampling(cfg_file):
+    access = AccessStats(sample=10)
+    config = Configuration(cfg_file, access=access)
+
+    for _ in range(10000):
+        config.name
+
+    assert 8000 < access.counts()['name'] < 12000
+    assert 'name' not in access.never_read()
+
+
+def test_access_reset_and_errors(cfg_file):
+    access = AccessStats()
+    config = Configuration(cfg_file, access=access)
+    config.name
+    access.reset()
+
+    assert access.counts() == {}
+    assert 'name' in access.never_read()
+    with pytest.raises(ValueError):
+        AccessStats(sample=0)
+
+
+def test_tracked_nodes_dump_and_pickle(cfg_file):
+    config = Configuration(cfg_file, access=AccessStats())
+
+    assert 'timeout: 10' in str(config)
+    database = pickle.loads(pickle.dumps(config.database))
+    assert type(database) is _YAMLObj
+    assert database.options.timeout == 10
+
+
+def test_access_leaves_keys_alone(tmpdir):
+    cfg_file = tmpdir.join('keys.yaml')
+    cfg_file.write('access: 1\n')
+
+    assert Configuration(str(cfg_file), access=AccessStats()).access == 1
+
+
+def test_no_access_tracking(cfg_file):
+    config = Configuration(cfg_file)
+
+    assert type(config.database) is _YAMLObj
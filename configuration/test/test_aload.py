@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import pytest
+
+from configuration import Configuration, ConfigurationError
+
+
+@pytest.fixture
+def cfg_files(tmpdir):
+    first = tmpdir.join('first.yaml')
+    first.write("""
+name: first
+client: !!object/call:test_aload.make_client
+    name: client
+service: !!object/call:test_aload.Service
+    client: !!object/call:test_aload.make_client
+        name: inner
+thread: !!object/call:test_aload.current_thread
+lazy: !!object/lazy:test_aload.make_client
+    name: lazy
+""")
+    second = tmpdir.join('second.yaml')
+    second.write("""
+name: second
+alias: !!ref:name
+""")
+    return str(first), str(second)
+
+
+@pytest.fixture
+def bad_cfg_file(tmpdir):
+    cfg_file = tmpdir.join('bad.yaml')
+    cfg_file.write("""
+bad: !!object/call:test_aload.fail
+outer: !!object/call:test_aload.Service
+    client: !!object/call:test_aload.fail
+""")
+    return str(cfg_file)
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def test_aload_merges_files_in_order(cfg_files):
+    config = run(Configuration.aload(*cfg_files))
+
+    assert config.name == 'second'
+    assert config.alias == 'second'
+
+
+def test_aload_awaits_async_calls(cfg_files):
+    config = run(Configuration.aload(*cfg_files))
+
+    assert config.client == {'name': 'client'}
+    # nested objects are passed as the PythonObject, built before the call
+    assert config.service.client._instance == {'name': 'inner'}
+
+
+def test_aload_runs_sync_calls_off_loop(cfg_files):
+    config = run(Configuration.aload(*cfg_files))
+
+    assert config.thread != threading.current_thread().name
+
+
+def test_aload_leaves_lazy_objects_awaitable(cfg_files):
+    async def main():
+        config = await Configuration.aload(*cfg_files)
+        return await config.lazy, await config.lazy
+
+    assert run(main()) == ({'name': 'lazy'}, {'name': 'lazy'})
+
+
+def test_aload_aggregates_errors(bad_cfg_file):
+    with pytest.raises(ConfigurationError) as e:
+        run(Configuration.aload(bad_cfg_file))
+
+    msg = e.value.args[0]
+    assert msg.count('test_aload.fail') == 2
+    assert 'test_aload.Service' in msg
+    assert 'not called' in msg
+
+
+def test_aload_watches_files_once_loaded(tmpdir):
+    cfg_file = tmpdir.join('watched.yaml')
+    cfg_file.write('watchers: !!object/call:test_aload.watchers\n')
+
+    async def main():
+        config = await Configuration.aload(str(cfg_file), watch=0.01)
+        try:
+            watcher = config._Configuration__watcher
+            assert watcher.is_alive()
+            # not running yet while the file was loaded
+            assert watcher not in config.watchers
+            cfg_file.write('watchers: []\n')
+            for _ in range(500):
+                if config.watchers == []:
+                    break
+                await asyncio.sleep(0.01)
+            assert config.watchers == []
+        finally:
+            config.close()
+
+    run(main())
+
+
+def test_aload_checks_options():
+    with pytest.raises(TypeError):
+        run(Configuration.aload(unknown=True))
+
+
+# classes used for testing
+async def make_client(name):
+    await asyncio.sleep(0)
+    return {'name': name}
+
+
+def current_thread():
+    return threading.current_thread().name
+
+
+async def watchers():
+    return [thread for thread in threading.enumerate()
+            if thread.name == 'configuration-watcher']
+
+
+def fail():
+    raise ValueError('no')
+
+
+class Service(object):
+    def __init__(self, client):
+        self.client = client
@@ -0,0 +1,73 @@
+import os
+import sys
+import pytest
+import tempfile
+
+import yaml
+
+from configuration import Configuration, ConfigurationError
+from configuration._loader import loader_class
+
+needs_libyaml = pytest.mark.skipif(not hasattr(yaml, 'CLoader'),
+                                   reason='PyYAML built without libyaml')
+
+
+@pytest.fixture(scope='session')
+def cfg_file(request):
+    tmp = tempfile.NamedTemporaryFile(mode='w', delete=False)
+    tmp.write("""
+ref_value: !!ref:some.value
+python_object: !!object:sys.stdout
+some:
+  value: worked
+    """)
+    tmp.close()
+
+    def fin():
+        os.remove(tmp.name)
+
+    request.addfinalizer(fin)
+
+    return tmp.name
+
+
+def test_python_backend_uses_pure_python_loader():
+    assert loader_class('python') is yaml.Loader
+
+
+@needs_libyaml
+def test_auto_backend_prefers_libyaml():
+    assert loader_class('auto') is yaml.CLoader
+    assert loader_class('c') is yaml.CLoader
+
+
+def test_auto_backend_falls_back_without_libyaml(monkeypatch):
+    monkeypatch.delattr(yaml, 'CLoader', raising=False)
+
+    assert loader_class('auto') is yaml.Loader
+
+
+def test_c_backend_raises_ConfigurationError_without_libyaml(monkeypatch):
+    monkeypatch.delattr(yaml, 'CLoader', raising=False)
+
+    with pytest.raises(ConfigurationError):
+        loader_class('c')
+
+
+def test_unknown_backend_raises_ConfigurationError():
+    with pytest.raises(ConfigurationError):
+        Configuration(backend='rust')
+
+
+def test_unknown_option_raises_TypeError():
+    with pytest.raises(TypeError):
+        Configuration(bakend='c')
+
+
+@needs_libyaml
+@pytest.mark.parametrize('backend', ['c', 'python'])
+def test_backends_construct_custom_tags(cfg_file, backend):
+    config = Configuration(cfg_file, backend=backend)
+
+    assert config.ref_value == 'worked'
+    assert config.python_object is sys.stdout
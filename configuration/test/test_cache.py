@@ -0,0 +1,111 @@
+import os
+import pytest
+import tempfile
+
+from configuration import Configuration, _base
+
+
+@pytest.fixture
+def cfg_file(request):
+    tmp = tempfile.NamedTemporaryFile(mode='w', delete=False)
+    tmp.write("""
+ref_value: !!ref:some.value
+python_instance: !!object/call:test_cache.MyTest
+    value: kwarg value
+python_lazy: !!object/lazy:test_cache.function
+some:
+  value: worked
+    """)
+    tmp.close()
+
+    def fin():
+        os.remove(tmp.name)
+
+    request.addfinalizer(fin)
+
+    return tmp.name
+
+
+@pytest.fixture
+def cache_dir(tmpdir):
+    return str(tmpdir.join('cache'))
+
+
+def test_cache_miss_writes_an_entry(cfg_file, cache_dir):
+    Configuration(cfg_file, cache=cache_dir)
+
+    entries = os.listdir(cache_dir)
+    assert len(entries) == 1
+    assert entries[0].endswith('.pickle')
+
+
+def test_cache_hit_does_not_parse(cfg_file, cache_dir, monkeypatch):
+    Configuration(cfg_file, cache=cache_dir)
+
+    def fail(*args):
+        raise AssertionError('parsed on a cache hit')
+
+    monkeypatch.setattr(_base, 'parse', fail)
+    config = Configuration(cfg_file, cache=cache_dir)
+
+    assert config.some.value == 'worked'
+    assert repr(config) == repr(Configuration(cfg_file, cache=cache_dir))
+
+
+def test_cache_hit_rebuilds_tags(cfg_file, cache_dir):
+    global X
+    Configuration(cfg_file, cache=cache_dir)
+    config = Configuration(cfg_file, cache=cache_dir)
+
+    assert config.ref_value == 'worked'
+    assert isinstance(config.python_instance, MyTest)
+    assert config.python_instance.value == 'kwarg value'
+
+    X = 'Test Passed'
+    assert config.python_lazy == 'Test Passed'
+    X = 10
+
+
+def test_changed_file_is_a_cache_miss(cfg_file, cache_dir):
+    Configuration(cfg_file, cache=cache_dir)
+    with open(cfg_file, 'a') as f:
+        f.write('\nextra: value\n')
+
+    config = Configuration(cfg_file, cache=cache_dir)
+
+    assert config.extra == 'value'
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_corrupt_entry_is_a_cache_miss(cfg_file, cache_dir):
+    Configuration(cfg_file, cache=cache_dir)
+    entry = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+    with open(entry, 'wb') as f:
+        f.write(b'not a pickle')
+
+    config = Configuration(cfg_file, cache=cache_dir)
+
+    assert config.some.value == 'worked'
+
+
+def test_unpicklable_document_is_not_cached(cache_dir, tmpdir):
+    cfg_file = tmpdir.join('stdout.yaml')
+    cfg_file.write('stream: !!python/name:sys.stdout\n')
+
+    Configuration(str(cfg_file), cache=cache_dir)
+
+    assert os.listdir(cache_dir) == []
+
+
+# classes used for testing
+X = 10
+
+
+class MyTest:
+    def __init__(self, value=None):
+        self.value = value
+
+
+def function():
+    global X
+    return X
@@ -0,0 +1,149 @@
+import os
+import sys
+import subprocess
+import pytest
+
+import yaml
+
+from configuration import Configuration, Snapshot
+from configuration.__main__ import main
+
+
+@pytest.fixture
+def yaml_file(tmpdir):
+    cfg_file = tmpdir.join('flags.yaml')
+    cfg_file.write("""
+flags:
+    new_ui: true
+    beta: false
+    dotted.key:
+        value: 1
+routes:
+    - path: /
+      service: web
+    - path: /api
+      service: api
+database:
+    host: localhost
+    port: 5432
+url: !!ref:database.host
+""")
+    return str(cfg_file)
+
+
+@pytest.fixture
+def compiled(yaml_file, tmpdir):
+    output = str(tmpdir.join('flags.cfgbin'))
+    assert main(['compile', yaml_file, output]) == 0
+    return output
+
+
+def test_compile_resolves_refs(compiled):
+    snapshot = Snapshot.load(compiled)
+
+    assert snapshot.url == 'localhost'
+
+
+def test_compiled_lookup(compiled):
+    snapshot = Snapshot.load(compiled)
+
+    assert snapshot.lookup('flags.new_ui') is True
+    assert snapshot.lookup('routes.1.service') == 'api'
+    assert snapshot.lookup('database') == {'host': 'localhost', 'port': 5432}
+    assert snapshot.flags['dotted.key'].value == 1
+    with pytest.raises(KeyError):
+        snapshot.lookup('flags.missing')
+    with pytest.raises(KeyError):
+        snapshot.lookup('flags.dotted.key')
+
+
+def test_compiled_index_matches_bisection(compiled):
+    indexed = Snapshot.load(compiled)
+    plain = Snapshot(Snapshot.dumps(Configuration(compiled)))
+
+    assert indexed._index is not None
+    assert plain._index is None
+    assert indexed.root == plain.root
+    assert plain.lookup('routes.1.service') == 'api'
+
+
+def test_configuration_loads_compiled_files(compiled, tmpdir):
+    override = tmpdir.join('override.yaml')
+    override.write('database:\n    port: 6543\nflags:\n    beta: true\n')
+    config = Configuration(compiled, str(override), merge='deep')
+
+    assert config.url == 'localhost'
+    assert config.routes[0].service == 'web'
+    assert config.database == {'host': 'localhost', 'port': 6543}
+    assert config.flags.beta is True
+    assert config.flags.new_ui is True
+
+
+def test_compiled_files_dump(compiled, tmpdir):
+    override = tmpdir.join('override.yaml')
+    override.write('database:\n    port: 6543\n')
+    config = Configuration(compiled, str(override), merge='deep')
+
+    dumped = yaml.safe_load(str(config))
+    assert dumped['database'] == {'host': 'localhost', 'port': 6543}
+    assert dumped['routes'][1] == {'path': '/api', 'service': 'api'}
+    # refs are stored resolved
+    assert yaml.safe_load(str(Configuration(compiled)))['url'] == 'localhost'
+
+
+def test_configuration_reloads_compiled_files(compiled, yaml_file, tmpdir):
+    config = Configuration(compiled)
+    with open(yaml_file, 'a') as f:
+        f.write('\nextra: 1\n')
+    main(['compile', yaml_file, compiled])
+
+    assert config.reload().added == set(['extra'])
+    assert config.extra == 1
+
+
+def test_compile_errors(tmpdir, capsys):
+    bad = tmpdir.join('bad.yaml')
+    bad.write('value: !!ref:missing\n')
+
+    assert main(['compile', str(bad), str(tmpdir.join('bad.cfgbin'))]) == 1
+    assert 'missing' in capsys.readouterr().err
+    assert not os.path.exists(str(tmpdir.join('bad.cfgbin')))
+
+    bad.write('value:\n    - !!set {a: null}\n')
+    assert main(['compile', str(bad), str(tmpdir.join('bad.cfgbin'))]) == 1
+    assert 'value.0' in capsys.readouterr().err
+
+    bad.write('paths:\n    join: !!object:os.path.join\n')
+    assert main(['compile', str(bad), str(tmpdir.join('bad.cfgbin'))]) == 1
+    assert 'paths.join' in capsys.readouterr().err
+    assert not os.path.exists(str(tmpdir.join('bad.cfgbin')))
+
+
+def test_compile_command_line(yaml_file, tmpdir):
+    output = str(tmpdir.join('cli.cfgbin'))
+    subprocess.check_call([sys.executable, '-m', 'configuration', 'compile',
+                           yaml_file, output])
+
+    assert Snapshot.load(output).flags.new_ui is True
+
+
+def test_configuration_accepts_path_objects(yaml_file, compiled):
+    pathlib = pytest.importorskip('pathlib')
+
+    assert Configuration(pathlib.Path(yaml_file)).url == 'localhost'
+    assert Configuration(pathlib.Path(compiled)).url == 'localhost'
+
+
+def test_merge_lists_over_compiled_files(compiled, tmpdir):
+    override = tmpdir.join('routes.yaml')
+    override.write('routes: !!merge:append\n    - path: /admin\n'
+                   '      service: admin\n')
+    config = Configuration(compiled, str(override))
+
+    assert [r.path for r in config.routes] == ['/', '/api', '/admin']
+    assert config.routes[0].service == 'web'
+
+    override.write('routes:\n    - path: /admin\n')
+    config = Configuration(compiled, str(override), lists='append')
+    assert [r['path'] for r in config.routes] == ['/', '/api', '/admin']
+    assert eval(repr(config))['routes'][-1] == {'path': '/admin'}
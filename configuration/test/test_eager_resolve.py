@@ -0,0 +1,138 @@
+import os
+import pytest
+import tempfile
+
+from configuration import Configuration, ConfigurationError
+from configuration.tags.ref import Ref
+
+
+def write_cfg(request, content):
+    tmp = tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False)
+    tmp.write(content)
+    tmp.close()
+
+    def fin():
+        os.remove(tmp.name)
+
+    request.addfinalizer(fin)
+
+    return tmp.name
+
+
+@pytest.fixture(scope='session')
+def cfg_file(request):
+    return write_cfg(request, """
+ref_value: !!ref:some.value
+ref_to_ref: !!ref:ref_value
+suffix_ref_value: !!ref:some.value:!!ref:ref_to_ref
+ref_to_mapping: !!ref:some
+through_ref: !!ref:ref_to_mapping.value
+some:
+  value: worked
+  nested_ref: !!ref:value
+    """)
+
+
+@pytest.fixture
+def cyclic_cfg_file(request):
+    return write_cfg(request, """
+a: !!ref:b
+b: !!ref:c
+c: !!ref:a
+    """)
+
+
+@pytest.fixture
+def missing_cfg_file(request):
+    return write_cfg(request, """
+value: worked
+missing: !!ref:not.there
+    """)
+
+
+def test_eager_resolve_replaces_refs_with_values(cfg_file):
+    config = Configuration(cfg_file, resolve='eager')
+    parsed = config._Configuration__parsed
+
+    for key in ('ref_value', 'ref_to_ref', 'suffix_ref_value'):
+        assert not isinstance(dict.__getitem__(parsed, key), Ref)
+    assert not isinstance(dict.__getitem__(parsed.some, 'nested_ref'), Ref)
+
+
+def test_eager_resolve_matches_lazy_resolve(cfg_file):
+    eager = Configuration(cfg_file, resolve='eager')
+    lazy = Configuration(cfg_file)
+
+    for key in ('ref_value', 'ref_to_ref', 'suffix_ref_value',
+                'through_ref'):
+        assert getattr(eager, key) == getattr(lazy, key)
+    assert eager.some.nested_ref == lazy.some.nested_ref == 'worked'
+    assert eager.ref_to_mapping is eager.some
+
+
+def test_eager_resolve_works_with_lazy_nodes(cfg_file):
+    config = Configuration(cfg_file, resolve='eager', lazy=True)
+
+    assert config.suffix_ref_value == 'workedworked'
+    assert config.some.nested_ref == 'worked'
+
+
+def test_eager_resolve_reports_cycles(cyclic_cfg_file):
+    with pytest.raises(ConfigurationError) as e:
+        Configuration(cyclic_cfg_file, resolve='eager')
+
+    msg = e.value.args[0]
+    assert 'Circular ref' in msg
+    assert cyclic_cfg_file in msg
+    assert 'line 2' in msg
+
+
+def test_eager_resolve_reports_missing_targets(missing_cfg_file):
+    with pytest.raises(ConfigurationError) as e:
+        Configuration(missing_cfg_file, resolve='eager')
+
+    msg = e.value.args[0]
+    assert 'Unable to find not.there' in msg
+    assert '{}", line 3'.format(missing_cfg_file) in msg
+
+
+def test_eager_resolve_across_files(request):
+    first = write_cfg(request, 'ref_value: !!ref:value\n')
+    second = write_cfg(request, 'value: worked\n')
+
+    config = Configuration(first, second, resolve='eager')
+
+    assert config.ref_value == 'worked'
+
+
+def test_unknown_resolve_mode_raises_ConfigurationError(cfg_file):
+    with pytest.raises(ConfigurationError):
+        Configuration(cfg_file, resolve='sometimes')
+
+
+def test_eager_resolve_indexes_lists(request):
+    cfg_file = write_cfg(request, """
+first_host: !!ref:servers.0.host
+servers:
+  - host: alpha
+    """)
+
+    config = Configuration(cfg_file, resolve='eager')
+
+    assert config.first_host == 'alpha'
+
+
+def test_eager_resolve_leaves_lazy_files_unchanged(request):
+    first = write_cfg(request, 'a:\n    b:\n        x: 1\n'
+                               '        r: !!ref:x\n')
+    second = write_cfg(request, 'c: 1\n')
+    config = Configuration(first, second, lazy=True, resolve='eager',
+                           merge='deep')
+    assert config.a.b.r == 1
+
+    with open(second, 'w') as f:
+        f.write('a:\n    b:\n        x: 5\n')
+    config.reload()
+
+    assert config.a.b.x == 5
+    assert config.a.b.r == 5
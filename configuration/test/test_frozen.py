@@ -0,0 +1,174 @@
+import copy
+import collections
+import pickle
+import pytest
+import threading
+
+from configuration import Configuration, ConfigurationError
+
+
+@pytest.fixture
+def cfg_file(tmpdir):
+    cfg_file = tmpdir.join('frozen.yaml')
+    cfg_file.write("""
+database:
+    host: localhost
+    options:
+        timeout: 10
+cache:
+    hosts:
+        - alpha
+        - beta
+    servers:
+        - name: one
+url: !!ref:database.host
+matrix:
+    - [1, 2]
+    - - k: v
+      - [3]
+""")
+    return str(cfg_file)
+
+
+@pytest.fixture
+def config(cfg_file):
+    return Configuration(cfg_file, frozen=True)
+
+
+def test_frozen_reads(config):
+    assert config.database.options.timeout == 10
+    assert config.cache.hosts == ['alpha', 'beta']
+    assert config.cache.servers[0].name == 'one'
+    assert config.url == 'localhost'
+
+
+def test_frozen_rejects_changes(config):
+    database = config.database
+    with pytest.raises(ConfigurationError):
+        database.host = 'other'
+    with pytest.raises(ConfigurationError):
+        database['host'] = 'other'
+    with pytest.raises(ConfigurationError):
+        del database.host
+    with pytest.raises(ConfigurationError):
+        database.update({'host': 'other'})
+    with pytest.raises(ConfigurationError):
+        config.cache.servers[0].name = 'two'
+    with pytest.raises((AttributeError, TypeError)):
+        config.cache.hosts.append('gamma')
+
+    assert database.host == 'localhost'
+
+
+def test_frozen_nested_lists(config):
+    matrix = config.matrix
+
+    assert matrix == [[1, 2], [{'k': 'v'}, [3]]]
+    with pytest.raises((AttributeError, TypeError)):
+        matrix[0].append(3)
+    with pytest.raises((AttributeError, TypeError)):
+        matrix[1][1].append(4)
+    with pytest.raises(ConfigurationError):
+        matrix[1][0].k = 'w'
+
+    assert matrix == [[1, 2], [{'k': 'v'}, [3]]]
+
+
+def test_evolve_shares_untouched_subtrees(config):
+    evolved = config.evolve({'database.options.timeout': 30,
+                             'cache.size': 5})
+
+    assert evolved.database.options.timeout == 30
+    assert evolved.cache.size == 5
+    assert evolved.database.host == 'localhost'
+    assert evolved.cache.hosts is config.cache.hosts
+    assert config.database.options.timeout == 10
+    assert 'size' not in config.cache
+    assert repr(evolved) != repr(config)
+
+
+def test_evolve_keeps_refs_live(config):
+    evolved = config.evolve({'database.host': 'db.prod'})
+
+    assert evolved.url == 'db.prod'
+    assert config.url == 'localhost'
+
+
+def test_evolve_replaces_mappings(config):
+    evolved = config.evolve({'database': {'host': 'db.prod'}})
+
+    assert evolved.database == {'host': 'db.prod'}
+    with pytest.raises(ConfigurationError):
+        evolved.database.host = 'other'
+
+
+def test_evolve_indexes_lists(config):
+    evolved = config.evolve({'cache.hosts.1': 'gamma',
+                             'cache.servers.0.name': 'two',
+                             'matrix.1.1.0': 4})
+
+    assert evolved.cache.hosts == ['alpha', 'gamma']
+    assert evolved.cache.servers[0].name == 'two'
+    assert evolved.matrix == [[1, 2], [{'k': 'v'}, [4]]]
+    assert evolved.matrix[0] is config.matrix[0]
+    assert 'gamma' in str(evolved)
+    assert config.cache.hosts == ['alpha', 'beta']
+    assert config.cache.servers[0].name == 'one'
+    with pytest.raises(ConfigurationError):
+        config.evolve({'cache.hosts.2': 'gamma'})
+    with pytest.raises(ConfigurationError):
+        config.evolve({'cache.hosts.first': 'gamma'})
+
+
+@pytest.mark.parametrize('changes', [
+    [('database', 1), ('database.host', 2)],
+    [('database.host', 2), ('database', 1)],
+])
+def test_evolve_rejects_overlapping_paths(config, changes):
+    with pytest.raises(ConfigurationError) as e:
+        config.evolve(collections.OrderedDict(changes))
+
+    assert 'database and database.host' in e.value.args[0]
+
+
+def test_evolve_mutable_config(cfg_file):
+    config = Configuration(cfg_file)
+    evolved = config.evolve({'database.host': 'db.prod'})
+    evolved.database.options.timeout = 30
+
+    assert config.database.host == 'localhost'
+    # untouched subtrees are shared
+    assert config.database.options.timeout == 30
+
+
+def test_frozen_copy_and_pickle(config):
+    database = config.database
+
+    assert copy.deepcopy(database) == database
+    assert pickle.loads(pickle.dumps(database)) == database
+    assert type(pickle.loads(pickle.dumps(database))) is type(database)
+
+
+def test_frozen_str(config):
+    assert '- alpha' in str(config)
+
+
+def test_frozen_threads(config):
+    results = []
+
+    def read():
+        for _ in range(1000):
+            results.append(config.url)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(results) == set(['localhost'])
+
+
+def test_frozen_and_lazy(cfg_file):
+    with pytest.raises(ConfigurationError):
+        Configuration(cfg_file, frozen=True, lazy=True)
@@ -0,0 +1,88 @@
+import os
+import pytest
+import tempfile
+
+from configuration import Configuration
+from configuration._base import _YAMLObj, _LazyYAMLObj
+
+
+@pytest.fixture(scope='session')
+def cfg_file(request):
+    tmp = tempfile.NamedTemporaryFile(mode='w', delete=False)
+    tmp.write("""
+test_list:
+  - item1
+  - sub_item: true
+    nested:
+      value: 1
+test_dict:
+  sub_item: true
+  nested:
+    value: worked
+    ref_value: !!ref:value
+    """)
+    tmp.close()
+
+    def fin():
+        os.remove(tmp.name)
+
+    request.addfinalizer(fin)
+
+    return tmp.name
+
+
+def test_lazy_config_keeps_nested_mappings_unwrapped(cfg_file):
+    config = Configuration(cfg_file, lazy=True)
+    parsed = config._Configuration__parsed
+
+    assert type(dict.__getitem__(parsed, 'test_dict')) is dict
+
+
+def test_lazy_config_wraps_on_attribute_access(cfg_file):
+    config = Configuration(cfg_file, lazy=True)
+
+    assert isinstance(config.test_dict, _LazyYAMLObj)
+    assert config.test_dict.nested.value == 'worked'
+
+
+def test_lazy_config_wraps_on_item_access(cfg_file):
+    config = Configuration(cfg_file, lazy=True)
+
+    assert config.test_dict['nested']['value'] == 'worked'
+
+
+def test_lazy_config_wraps_only_once(cfg_file):
+    config = Configuration(cfg_file, lazy=True)
+
+    assert config.test_dict is config.test_dict
+    assert config.test_dict.nested is config.test_dict.nested
+
+
+def test_lazy_config_wraps_mappings_in_lists(cfg_file):
+    config = Configuration(cfg_file, lazy=True)
+
+    assert config.test_list[0] == 'item1'
+    assert config.test_list[1].sub_item is True
+    assert config.test_list[1].nested.value == 1
+
+
+def test_lazy_config_resolves_refs(cfg_file):
+    config = Configuration(cfg_file, lazy=True)
+
+    assert config.test_dict.nested.ref_value == 'worked'
+
+
+def test_lazy_config_iteration_wraps_values(cfg_file):
+    config = Configuration(cfg_file, lazy=True)
+    values = dict((k, v) for k, v in config)
+
+    assert isinstance(values['test_dict'], _LazyYAMLObj)
+    assert values['test_dict'].nested.value == 'worked'
+
+
+def test_lazy_config_equals_eager_config(cfg_file):
+    lazy = Configuration(cfg_file, lazy=True)
+    eager = Configuration(cfg_file)
+
+    assert isinstance(eager.test_dict, _YAMLObj)
+    assert str(lazy) == str(eager)
@@ -0,0 +1,54 @@
+import pytest
+import yaml
+
+from configuration import ConfigurationError
+from configuration._loader import parse
+from configuration.tags import TagRegistry
+
+
+@pytest.fixture(scope='module', autouse=True)
+def setup_tags():
+    TagRegistry().setup_yaml(yaml)
+
+
+def test_parse_composes_the_document_once(monkeypatch):
+    calls = []
+    compose = yaml.Loader.get_single_node
+
+    def counting_compose(self):
+        calls.append(self)
+        return compose(self)
+
+    monkeypatch.setattr(yaml.Loader, 'get_single_node', counting_compose)
+    parse('value: 1\n')
+
+    assert len(calls) == 1
+
+
+def test_parse_builds_raw_and_parsed_views():
+    raw, parsed = parse('ref_value: !!ref:value\nvalue: worked\n')
+
+    assert raw == {'ref_value': '!!ref:value', 'value': 'worked'}
+    assert parsed['value'] == 'worked'
+    assert parsed['ref_value'].ref == 'value'
+
+
+def test_parse_keeps_merge_keys_in_both_views():
+    raw, parsed = parse('base: &base {a: 1}\nchild:\n  <<: *base\n  b: 2\n')
+
+    assert raw['child'] == {'a': 1, 'b': 2}
+    assert parsed['child'] == {'a': 1, 'b': 2}
+
+
+def test_parse_empty_document_is_empty_mapping():
+    assert parse('') == ({}, {})
+
+
+def test_parse_raises_ConfigurationError_for_non_mapping():
+    with pytest.raises(ConfigurationError):
+        parse('- item1\n- item2\n')
+
+
+def test_parse_raises_ConfigurationError_for_bad_syntax():
+    with pytest.raises(ConfigurationError):
+        parse('test: [unclosed\n')
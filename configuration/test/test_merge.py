@@ -0,0 +1,161 @@
+import pytest
+
+from configuration import Configuration, ConfigurationError
+
+
+@pytest.fixture
+def base_file(tmpdir):
+    cfg_file = tmpdir.join('base.yaml')
+    cfg_file.write("""
+database:
+    host: localhost
+    port: 5432
+    options:
+        timeout: 10
+        retries: 3
+hosts:
+    - alpha
+    - beta
+url: !!ref:database.host
+""")
+    return str(cfg_file)
+
+
+@pytest.fixture
+def override_file(tmpdir):
+    cfg_file = tmpdir.join('override.yaml')
+    cfg_file.write("""
+database:
+    host: db.prod
+    options:
+        timeout: 30
+hosts:
+    - beta
+    - gamma
+""")
+    return str(cfg_file)
+
+
+@pytest.fixture
+def tagged_file(tmpdir):
+    cfg_file = tmpdir.join('tagged.yaml')
+    cfg_file.write("""
+database: !!merge:deep
+    host: db.prod
+    options: !!merge:replace
+        timeout: 30
+hosts: !!merge:append
+    - gamma
+""")
+    return str(cfg_file)
+
+
+def test_default_replaces_top_level_keys(base_file, override_file):
+    config = Configuration(base_file, override_file)
+
+    assert config.database == {'host': 'db.prod',
+                               'options': {'timeout': 30}}
+    assert config.hosts == ['beta', 'gamma']
+
+
+def test_deep_merge(base_file, override_file):
+    config = Configuration(base_file, override_file, merge='deep')
+
+    assert config.database == {'host': 'db.prod', 'port': 5432,
+                               'options': {'timeout': 30, 'retries': 3}}
+    assert config.database.options.retries == 3
+    assert config.url == 'db.prod'
+    assert repr(config) == repr({
+        'database': {'host': 'db.prod', 'port': 5432,
+                     'options': {'timeout': 30, 'retries': 3}},
+        'hosts': ['beta', 'gamma'], 'url': '!!ref:database.host'})
+
+
+def test_list_strategies(base_file, override_file):
+    config = Configuration(base_file, override_file, lists='append')
+    assert config.hosts == ['alpha', 'beta', 'beta', 'gamma']
+
+    config = Configuration(base_file, override_file, lists='unique')
+    assert config.hosts == ['alpha', 'beta', 'gamma']
+
+
+def test_merge_tag(base_file, tagged_file):
+    config = Configuration(base_file, tagged_file)
+
+    assert config.database == {'host': 'db.prod', 'port': 5432,
+                               'options': {'timeout': 30}}
+    assert config.hosts == ['alpha', 'beta', 'gamma']
+
+
+def test_merge_tag_in_first_file(tagged_file):
+    config = Configuration(tagged_file)
+
+    assert config.database.options == {'timeout': 30}
+    assert config.hosts == ['gamma']
+
+
+def test_merge_tag_lazy(base_file, tagged_file):
+    config = Configuration(base_file, tagged_file, lazy=True)
+
+    assert config.database.options == {'timeout': 30}
+    assert config.database.port == 5432
+
+
+def test_merge_does_not_change_earlier_files(base_file, override_file):
+    config = Configuration(base_file, merge='deep')
+    options = config.database.options
+    config.load(override_file)
+
+    assert options == {'timeout': 10, 'retries': 3}
+    assert config.database.options.timeout == 30
+
+
+def test_unknown_strategy(base_file, tmpdir):
+    with pytest.raises(ConfigurationError):
+        Configuration(base_file, merge='sideways')
+
+    with pytest.raises(ConfigurationError):
+        Configuration(base_file, lists='sideways')
+
+    cfg_file = tmpdir.join('bad.yaml')
+    cfg_file.write('hosts: !!merge:sideways [a]\n')
+    with pytest.raises(ConfigurationError):
+        Configuration(str(cfg_file))
+
+
+def test_reload_deep_merges(base_file, override_file, tmpdir):
+    config = Configuration(base_file, override_file, merge='deep')
+    tmpdir.join('new.yaml').write('database:\n    port: 6543\n')
+    tmpdir.join('new.yaml').rename(override_file)
+    changes = config.reload()
+
+    assert config.database == {'host': 'localhost', 'port': 6543,
+                               'options': {'timeout': 10, 'retries': 3}}
+    assert changes.modified == set(['database.host', 'database.port',
+                                    'database.options.timeout', 'hosts',
+                                    'url'])
+
+
+def test_merge_tag_in_raw_view(base_file, tagged_file):
+    config = Configuration(base_file)
+    calls = []
+    config.subscribe('database.host', calls.append)
+    config.load(tagged_file)
+
+    assert eval(repr(config)) == {
+        'database': {'host': 'db.prod', 'port': 5432,
+                     'options': {'timeout': 30}},
+        'hosts': ['alpha', 'beta', 'gamma'],
+        'url': '!!ref:database.host',
+    }
+    changes = calls[0]
+    assert 'database.host' in changes.modified
+    assert 'database.options.retries' in changes.removed
+    assert 'hosts' in changes.modified
+
+
+def test_merge_tag_in_first_file_raw_view(tagged_file):
+    config = Configuration(tagged_file)
+
+    assert eval(repr(config))['database'] == {'host': 'db.prod',
+                                              'options': {'timeout': 30}}
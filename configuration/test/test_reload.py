@@ -0,0 +1,161 @@
+import os
+import time
+import pytest
+
+from configuration import Configuration, ChangeSet
+
+
+@pytest.fixture
+def base_file(tmpdir):
+    cfg_file = tmpdir.join('base.yaml')
+    cfg_file.write("""
+name: base
+port: 80
+db:
+    host: old
+url: !!ref:name
+obj: !!object/call:test_reload.Counted
+""")
+    return cfg_file
+
+
+@pytest.fixture
+def override_file(tmpdir):
+    cfg_file = tmpdir.join('override.yaml')
+    cfg_file.write("""
+port: 8080
+""")
+    return cfg_file
+
+
+def rewrite(cfg_file, data):
+    # Write next to the file and rename over it, like deploy tools do
+    tmp = cfg_file.dirpath().join(cfg_file.basename + '.tmp')
+    tmp.write(data)
+    os.rename(str(tmp), str(cfg_file))
+
+
+def test_reload_without_changes(base_file, override_file):
+    config = Configuration(str(base_file), str(override_file))
+
+    assert config.reload() == ChangeSet()
+    assert not config.reload()
+    assert config.port == 8080
+
+
+def test_reload_picks_up_changes(base_file, override_file):
+    config = Configuration(str(base_file), str(override_file))
+    rewrite(override_file, 'port: 9090\nname: changed\n')
+
+    assert config.reload() == ChangeSet(modified=['port', 'name', 'url'])
+    assert config.port == 9090
+    assert config.url == 'changed'
+    assert repr(config) == repr({'name': 'changed', 'port': 9090,
+                                 'db': {'host': 'old'}, 'url': '!!ref:name',
+                                 'obj': '!!object/call:test_reload.Counted'})
+
+
+def test_reload_only_parses_changed_files(base_file, override_file):
+    Counted.count = 0
+    config = Configuration(str(base_file), str(override_file))
+    obj = config.obj
+    rewrite(override_file, 'port: 9090\n')
+    config.reload()
+
+    assert Counted.count == 1
+    assert config.obj is obj
+
+
+def test_reload_swaps_snapshot(base_file, override_file):
+    config = Configuration(str(base_file), str(override_file))
+    db = config.db
+    rewrite(override_file, 'db:\n    host: new\n')
+    config.reload()
+
+    # readers holding a node of the old snapshot keep a consistent view
+    assert db.host == 'old'
+    assert config.db.host == 'new'
+
+
+def test_reload_keeps_snapshot_on_error(base_file, override_file):
+    config = Configuration(str(base_file), str(override_file))
+    rewrite(override_file, 'port: [9090\n')
+
+    with pytest.raises(Exception):
+        config.reload()
+    assert config.port == 8080
+
+
+def test_reload_reports_nested_changes(base_file, override_file):
+    config = Configuration(str(base_file), str(override_file))
+    rewrite(override_file, 'db:\n    host: old\n    user: me\n')
+    changes = config.reload()
+
+    assert changes == ChangeSet(added=['db.user'], modified=['port'])
+    assert config.port == 80
+
+
+def test_reload_reports_changed_tag_arguments(base_file, override_file):
+    rewrite(override_file, 'obj: !!object/call:test_reload.Counted\n'
+                           '    size: 10\n')
+    config = Configuration(str(base_file), str(override_file))
+    calls = []
+    config.subscribe('obj', calls.append)
+    rewrite(override_file, 'obj: !!object/call:test_reload.Counted\n'
+                           '    size: 20\n')
+
+    assert config.reload() == ChangeSet(modified=['obj'])
+    assert config.obj.size == 20
+    assert calls == [ChangeSet(modified=['obj'])]
+    assert repr(config) == repr({'name': 'base', 'port': 80,
+                                 'db': {'host': 'old'}, 'url': '!!ref:name',
+                                 'obj': '!!object/call:test_reload.Counted'})
+
+
+def test_reload_removed_key(base_file, override_file):
+    override_file.write('port: 8080\nextra: 1\n')
+    config = Configuration(str(base_file), str(override_file))
+    rewrite(override_file, 'port: 8080\n')
+
+    assert config.reload() == ChangeSet(removed=['extra'])
+    assert 'extra' not in config
+
+
+def test_reload_only_merges_changed_keys(base_file, override_file):
+    config = Configuration(str(base_file), str(override_file))
+    db = config.db
+    rewrite(override_file, 'port: 9090\n')
+    config.reload()
+
+    assert config.db is db
+
+
+def test_reload_eager(base_file, override_file):
+    config = Configuration(str(base_file), str(override_file),
+                           resolve='eager')
+    rewrite(override_file, 'name: changed\n')
+
+    assert config.reload() == ChangeSet(modified=['name', 'port', 'url'])
+    assert config.url == 'changed'
+
+
+def test_watch(base_file, override_file):
+    config = Configuration(str(base_file), str(override_file), watch=0.01)
+    try:
+        rewrite(override_file, 'port: 9090\n')
+        deadline = time.time() + 5
+        while config.port != 9090 and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert config.port == 9090
+    finally:
+        config.close()
+
+
+# classes used for testing
+class Counted(object):
+    count = 0
+
+    def __init__(self, size=None):
+        Counted.count += 1
+        self.size = size
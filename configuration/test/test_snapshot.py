@@ -0,0 +1,166 @@
+import sys
+import pytest
+import datetime
+import subprocess
+
+from configuration import Configuration, ConfigurationError, Snapshot
+
+
+@pytest.fixture
+def cfg_file(tmpdir):
+    cfg_file = tmpdir.join('snapshot.yaml')
+    cfg_file.write(u"""
+name: service
+port: 8080
+ratio: 0.5
+debug: false
+missing: null
+big: 100000000000000000000
+unicode: café
+hosts: &hosts
+    - alpha
+    - beta
+backup_hosts: *hosts
+database:
+    host: localhost
+    options:
+        timeout: 10
+url: !!ref:database.host
+obj: !!object/lazy:test_snapshot.fail
+""".encode('utf-8'), mode='wb')
+    return str(cfg_file)
+
+
+@pytest.fixture
+def config(cfg_file):
+    return Configuration(cfg_file)
+
+
+def test_snapshot_reads_plain_data(config):
+    snapshot = Snapshot(Snapshot.dumps(config))
+
+    assert snapshot.name == 'service'
+    assert snapshot.port == 8080
+    assert snapshot.ratio == 0.5
+    assert snapshot.debug is False
+    assert snapshot.missing is None
+    assert snapshot.unicode == u'café'
+    assert snapshot.hosts == ['alpha', 'beta']
+    assert snapshot.hosts[-1] == 'beta'
+    assert snapshot['database']['options'].timeout == 10
+    assert snapshot.database == {'host': 'localhost',
+                                 'options': {'timeout': 10}}
+    assert snapshot.url == 'localhost'
+    assert 'port' in snapshot
+    assert 'nothing' not in snapshot
+    with pytest.raises(AttributeError):
+        snapshot.nothing
+
+
+def test_snapshot_leaves_out_objects(config):
+    snapshot = Snapshot(Snapshot.dumps(config))
+
+    # the lazy object is not built
+    assert 'obj' not in snapshot
+
+
+def test_snapshot_dates_bytes_and_big_ints(tmpdir):
+    cfg_file = tmpdir.join('dates.yaml')
+    cfg_file.write("""
+big: 100000000000000000000
+small: -100000000000000000000
+when: 2020-01-02
+at: 2020-01-02 03:04:05.25
+zoned: 2020-01-02T03:04:05+02:00
+data: !!binary aGVsbG8=
+""")
+    config = Configuration(str(cfg_file))
+    snapshot = Snapshot(Snapshot.dumps(config, index=True))
+
+    for key in ('big', 'small', 'when', 'at', 'data'):
+        assert snapshot[key] == getattr(config, key)
+        assert type(snapshot[key]) is type(getattr(config, key))
+    assert snapshot.lookup('when') == datetime.date(2020, 1, 2)
+    if sys.version_info >= (3,):
+        assert snapshot.zoned == config.zoned
+        assert snapshot.zoned.utcoffset() == datetime.timedelta(hours=2)
+
+
+def test_snapshot_errors_name_the_path():
+    with pytest.raises(ConfigurationError) as error:
+        Snapshot.dumps({'servers': [{'ports': set([80])}]})
+
+    assert 'servers.0.ports' in str(error.value)
+
+
+def test_snapshot_rejects_keys_that_are_not_strings():
+    with pytest.raises(ConfigurationError) as error:
+        Snapshot.dumps({'a': {1: 'x', 'b': 2}})
+
+    assert "a, the key 1 " in str(error.value)
+
+
+def test_strict_snapshot_rejects_objects(config):
+    with pytest.raises(ConfigurationError) as error:
+        Snapshot.dumps(config, strict=True)
+
+    assert 'snapshot obj,' in str(error.value)
+
+
+def test_snapshot_lazy_config(tmpdir):
+    cfg_file = tmpdir.join('lazy.yaml')
+    cfg_file.write("""
+a:
+    b:
+        c: 1
+        d: !!ref:c
+    e: !!ref:b.c
+""")
+    config = Configuration(str(cfg_file), lazy=True)
+    snapshot = Snapshot(Snapshot.dumps(config))
+
+    assert snapshot.a.b.d == 1
+    assert snapshot.a.e == 1
+
+
+def test_snapshot_writes_shared_values_once(config):
+    data = Snapshot.dumps(config)
+
+    assert data.count(b'alpha') == 1
+
+
+def test_snapshot_file(config, tmpdir):
+    path = str(tmpdir.join('config.snapshot'))
+    Snapshot.save(config, path)
+
+    with Snapshot.load(path) as snapshot:
+        assert snapshot.database.options.timeout == 10
+
+
+def test_snapshot_rejects_other_data():
+    with pytest.raises(ConfigurationError):
+        Snapshot(b'not a snapshot at all')
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason='shared_memory')
+def test_snapshot_shared_memory(config):
+    snapshot = Snapshot.share(config)
+    try:
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys; from configuration import Snapshot; '
+            's = Snapshot.attach(sys.argv[1]); '
+            'print(s.database.options.timeout, s.hosts[1]); '
+            's.close()',
+            snapshot.shared_name])
+
+        assert output.split() == [b'10', b'beta']
+        assert snapshot.url == 'localhost'
+    finally:
+        snapshot.close()
+        snapshot.unlink()
+
+
+# classes used for testing
+def fail():
+    raise RuntimeError('lazy objects are not built for snapshots')
@@ -0,0 +1,107 @@
+import json
+import asyncio
+import logging
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from configuration import Configuration, LoadStats, TagRegistry
+from configuration._loader import loader_class
+
+
+@pytest.fixture
+def cfg_files(tmpdir):
+    base = tmpdir.join('base.yaml')
+    base.write("""
+name: service
+url: !!ref:name
+join: !!object:os.path.join
+delay: !!object/call:datetime.timedelta
+    seconds: 5
+""")
+    override = tmpdir.join('override.yaml')
+    override.write('name: other\n')
+    return str(base), str(override)
+
+
+def test_stats_record_phases_per_file(cfg_files):
+    stats = LoadStats()
+    config = Configuration(*cfg_files, stats=stats, resolve='eager')
+
+    assert config.url == 'other'
+    for phase in ('read', 'parse', 'raw', 'construct', 'merge', 'resolve'):
+        count, seconds = stats.phases[phase]
+        assert seconds >= 0
+    assert stats.phases['read'][0] == 2
+    assert stats.phases['resolve'][0] == 1
+    assert set(stats.files) == set(cfg_files)
+    assert 'construct' in stats.files[cfg_files[0]]
+    assert 'resolve' not in stats.files[cfg_files[0]]
+    assert stats.total > 0
+
+
+def test_stats_leaves_keys_alone(tmpdir):
+    cfg_file = tmpdir.join('keys.yaml')
+    cfg_file.write('stats: 1\n')
+
+    assert Configuration(str(cfg_file), stats=LoadStats()).stats == 1
+
+
+def test_stats_record_tags(cfg_files):
+    stats = LoadStats()
+    Configuration(cfg_files[0], stats=stats)
+
+    assert stats.tags['ref'][0] == 1
+    assert stats.tags['object'][0] == 1
+    assert stats.tags['object/call'][0] == 1
+    assert json.loads(json.dumps(stats.as_dict()))['tags']['ref'] == {
+        'count': 1, 'seconds': stats.tags['ref'][1]}
+
+
+def test_stats_calls_and_cache(cfg_files, tmpdir):
+    stats = LoadStats()
+    with ThreadPoolExecutor(2) as executor:
+        Configuration(cfg_files[0], stats=stats, executor=executor,
+                      cache=str(tmpdir.join('cache')))
+
+    assert stats.phases['calls'][0] == 1
+    assert stats.phases['cache'][0] == 1
+
+
+def test_stats_listener_and_log(cfg_files, caplog):
+    records = []
+    stats = LoadStats(lambda *record: records.append(record))
+    Configuration(cfg_files[0], stats=stats)
+
+    assert ('tag', 'ref') in [(phase, name) for phase, name, s in records]
+    assert ('read', cfg_files[0]) in [(p, n) for p, n, s in records]
+
+    with caplog.at_level(logging.INFO, logger='configuration'):
+        stats.log()
+    assert 'load phase construct' in caplog.text
+    assert 'load tag object/call' in caplog.text
+
+    stats.clear()
+    assert stats.as_dict() == {'phases': {}, 'files': {}, 'tags': {}}
+
+
+def test_no_stats_uses_untimed_loader(cfg_files):
+    config = Configuration(cfg_files[0])
+    tags = TagRegistry()
+    loader = loader_class()
+
+    assert config._stats is None
+    assert tags.loader(loader) is not tags.loader(loader, timed=True)
+    assert (tags.loader(loader).multi_tag_prefixes['tag:yaml.org,2002:ref:']
+            is not tags.loader(loader, timed=True).multi_tag_prefixes[
+                'tag:yaml.org,2002:ref:'])
+
+
+def test_aload_stats(cfg_files):
+    stats = LoadStats()
+    asyncio.new_event_loop().run_until_complete(
+        Configuration.aload(*cfg_files, stats=stats))
+
+    assert stats.phases['read'][0] == 2
+    assert stats.phases['calls'][0] == 1
+    assert stats.tags['object/call'][0] == 1
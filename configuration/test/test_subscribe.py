@@ -0,0 +1,135 @@
+import os
+import pytest
+
+from configuration import Configuration
+from configuration._subscribe import PathTrie
+
+
+@pytest.fixture
+def base_file(tmpdir):
+    cfg_file = tmpdir.join('base.yaml')
+    cfg_file.write("""
+db:
+    host: localhost
+    pool_size: 5
+cache:
+    size: 10
+url: !!ref:db.host
+link: !!ref:url:/path
+service:
+    endpoint: !!ref:address
+    address: svc.local
+""")
+    return cfg_file
+
+
+@pytest.fixture
+def override_file(tmpdir):
+    cfg_file = tmpdir.join('override.yaml')
+    cfg_file.write('cache:\n    size: 20\n')
+    return cfg_file
+
+
+@pytest.fixture
+def config(base_file, override_file):
+    return Configuration(str(base_file), str(override_file), merge='deep')
+
+
+def rewrite(cfg_file, data):
+    tmp = cfg_file.dirpath().join(cfg_file.basename + '.tmp')
+    tmp.write(data)
+    os.rename(str(tmp), str(cfg_file))
+
+
+def subscribe(config, *paths):
+    calls = []
+    for path in paths:
+        config.subscribe(path, lambda changes, path=path: calls.append(
+            (path, changes)))
+    return calls
+
+
+def test_subscribe_exact_path(config, override_file):
+    calls = subscribe(config, 'db.pool_size', 'cache.size')
+    rewrite(override_file, 'db:\n    pool_size: 10\ncache:\n    size: 20\n')
+    config.reload()
+
+    assert [path for path, changes in calls] == ['db.pool_size']
+    assert calls[0][1].modified == set(['db.pool_size'])
+    assert config.db.pool_size == 10
+
+
+def test_subscribe_parent_and_child_paths(config, override_file):
+    calls = subscribe(config, 'db', 'db.pool_size.unused', 'cache')
+    rewrite(override_file, 'db:\n    pool_size: 10\ncache:\n    size: 20\n')
+    config.reload()
+
+    assert sorted(path for path, changes in calls) == [
+        'db', 'db.pool_size.unused']
+
+
+def test_subscribe_follows_refs(config, override_file):
+    calls = subscribe(config, 'url', 'link', 'service.endpoint')
+    rewrite(override_file, 'db:\n    host: db.prod\n')
+    changes = config.reload()
+
+    assert sorted(path for path, changes in calls) == ['link', 'url']
+    assert changes.modified >= set(['db.host', 'url', 'link'])
+    assert config.link == 'db.prod/path'
+
+
+def test_subscribe_follows_relative_refs(config, override_file):
+    calls = subscribe(config, 'service.endpoint')
+    rewrite(override_file, 'service:\n    address: svc.prod\n')
+    config.reload()
+
+    assert [path for path, changes in calls] == ['service.endpoint']
+
+
+def test_subscribe_on_load(config, tmpdir):
+    calls = subscribe(config, 'cache.size', 'db')
+    tmpdir.join('more.yaml').write('cache:\n    size: 30\n')
+    config.load(str(tmpdir.join('more.yaml')))
+
+    assert [path for path, changes in calls] == ['cache.size']
+
+
+def test_unsubscribe(config, override_file):
+    calls = []
+    unsubscribe = config.subscribe('cache', calls.append)
+    unsubscribe()
+    rewrite(override_file, 'cache:\n    size: 30\n')
+    config.reload()
+
+    assert calls == []
+
+
+def test_failing_subscriber_does_not_stop_others(config, override_file):
+    def fail(changes):
+        raise RuntimeError('failed')
+
+    config.subscribe('cache', fail)
+    calls = subscribe(config, 'cache')
+    rewrite(override_file, 'cache:\n    size: 30\n')
+    config.reload()
+
+    assert len(calls) == 1
+
+
+def test_path_trie():
+    trie = PathTrie()
+    trie.add('a.b', 1)
+    trie.add('a.b', 1)
+    trie.add('a.c.d', 2)
+    trie.add('e', 3)
+
+    assert sorted(trie.match('a')) == [1, 2]
+    assert sorted(trie.match('a.b.x')) == [1]
+    assert list(trie.match('x')) == []
+
+    trie.discard('a.b', 1)
+    assert sorted(trie.match('a')) == [1, 2]
+    trie.discard('a.b', 1)
+    trie.discard('a.c.d', 2)
+    assert list(trie.match('a')) == []
+    assert list(trie.children) == ['e']
@@ -0,0 +1,91 @@
+import copy
+import pytest
+
+import yaml
+
+from configuration._base import _YAMLObj, _LazyYAMLObj
+
+
+@pytest.fixture(params=[_YAMLObj, _LazyYAMLObj])
+def node(request):
+    return request.param({
+        'value': 1,
+        'nested': {'value': 2},
+        'list': [{'value': 3}, 'plain'],
+    })
+
+
+def test_node_has_no_instance_dict(node):
+    assert not hasattr(node, '__dict__')
+
+
+def test_node_serves_attributes_from_dict_storage(node):
+    assert node.value == 1
+    assert node['value'] == 1
+    assert node.nested.value == 2
+    assert node.list[0].value == 3
+
+
+def test_node_set_attribute_is_visible_as_item(node):
+    node.new_value = 'set'
+    node['new_item'] = 'set'
+
+    assert node['new_value'] == 'set'
+    assert node.new_item == 'set'
+
+
+def test_node_keys_shadow_dict_methods(node):
+    node.items = 'shadowed'
+
+    assert node.items == 'shadowed'
+    assert dict.items(node)
+
+
+def test_node_del_attribute_removes_key(node):
+    del node.value
+
+    assert 'value' not in node
+    with pytest.raises(AttributeError):
+        node.value
+    with pytest.raises(AttributeError):
+        del node.value
+
+
+def test_node_missing_attribute_raises_AttributeError(node):
+    with pytest.raises(AttributeError):
+        node.missing
+
+
+def test_node_deepcopy(node):
+    clone = copy.deepcopy(node)
+
+    assert type(clone) is type(node)
+    assert clone == node
+    assert clone.nested.value == 2
+
+
+def test_node_dumps_as_plain_mapping(node):
+    assert yaml.safe_load(yaml.dump(node)) == {
+        'value': 1,
+        'nested': {'value': 2},
+        'list': [{'value': 3}, 'plain'],
+    }
+
+
+def test_node_resolves_descriptor_values(node):
+    node.descriptor = Descriptor()
+
+    assert node.descriptor is node
+    assert node['descriptor'] is node
+
+
+def test_node_returns_classes_unresolved(node):
+    node.descriptor_class = Descriptor
+
+    assert node.descriptor_class is Descriptor
+
+
+# classes used for testing
+class Descriptor(object):
+    def __get__(self, instance, owner):
+        return instance
@@ -1,5 +1,6 @@
 import os
 import io
+import re
 from setuptools import setup, find_packages
 
 
@@ -8,10 +9,13 @@ cwd = os.path.abspath(os.path.dirname(__file__))
 with io.open(os.path.join(cwd, 'README.rst'), encoding='utf-8') as fd:
     long_description = fd.read()
 
+with io.open(os.path.join(cwd, 'configuration', '_version.py')) as fd:
+    version = re.search(r"__version__ = '(.*)'", fd.read()).group(1)
+
 
 setup(
     name='configuration',
-    version='0.4.1',
+    version=version,
     description=('Thin wrapper around PyYAML that allows you to '
                  'access values in dot notation config.value...'),
     long_description=long_description,
@@ -32,6 +36,9 @@ setup(
         'Topic :: Software Development :: Libraries :: Application Frameworks',
     ],
     keywords=('yaml config configuration'),
-    packages=find_packages(),
-    install_requires=['PyYAML']
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
+    install_requires=['PyYAML'],
+    entry_points={
+        'console_scripts': ['configuration = configuration.__main__:main'],
+    },
 )